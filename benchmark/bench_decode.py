@@ -0,0 +1,107 @@
+# Copyright (c) 2023 Nanahuse
+# This software is released under the MIT License
+# https://github.com/Nanahuse/PyRacetimeGG/blob/main/LICENSE
+
+"""
+microbenchmark of decoding a page of past races.
+python benchmark/bench_decode.py
+"""
+
+from timeit import repeat
+from pyracetimegg import Race
+from pyracetimegg.object_mapping import APIBase
+
+NUM_RACES = 10
+NUM_ENTRANTS = 50
+
+
+def user(i: int):
+    return {
+        "id": f"user{i:012d}",
+        "full_name": f"name{i}#{i:04d}",
+        "name": f"name{i}",
+        "discriminator": f"{i:04d}",
+        "url": f"/user/user{i:012d}",
+        "avatar": None,
+        "pronouns": "he/him",
+        "flair": "",
+        "twitch_name": None,
+        "twitch_display_name": None,
+        "twitch_channel": None,
+        "can_moderate": False,
+    }
+
+
+def entrant(i: int):
+    return {
+        "user": user(i),
+        "team": None,
+        "status": {"value": "done", "verbose_value": "Finished", "help_text": ""},
+        "finish_time": f"P0DT01H{i % 60:02d}M13.497596S",
+        "finished_at": "2023-01-01T01:23:45.678Z",
+        "place": i + 1,
+        "place_ordinal": f"{i + 1}th",
+        "score": 1500,
+        "score_change": 12,
+        "comment": None,
+        "has_comment": False,
+        "stream_live": False,
+        "stream_override": False,
+    }
+
+
+def race(k: int):
+    return {
+        "name": f"smw/race-name-{k:04d}",
+        "status": {"value": "finished", "verbose_value": "Finished", "help_text": ""},
+        "url": f"/smw/race-name-{k:04d}",
+        "data_url": f"/smw/race-name-{k:04d}/data",
+        "goal": {"name": "Any%", "custom": False},
+        "info": "",
+        "entrants_count": NUM_ENTRANTS,
+        "entrants_count_finished": NUM_ENTRANTS,
+        "entrants_count_inactive": 0,
+        "entrants": [entrant(i) for i in range(NUM_ENTRANTS)],
+        "opened_at": "2023-01-01T00:00:00.000Z",
+        "started_at": "2023-01-01T00:10:00.000Z",
+        "ended_at": "2023-01-01T02:10:00.000Z",
+        "cancelled_at": None,
+        "opened_by": user(0),
+        "start_delay": "P0DT00H00M15S",
+        "time_limit": "P1DT00H00M00S",
+        "time_limit_auto_complete": False,
+        "require_even_teams": False,
+        "streaming_required": False,
+        "auto_start": True,
+        "recordable": True,
+        "recorded": False,
+        "recorded_by": None,
+        "allow_comments": True,
+        "hide_comments": False,
+        "allow_prerace_chat": True,
+        "allow_midrace_chat": True,
+        "allow_non_entrant_chat": True,
+        "chat_message_delay": "P0DT00H00M00S",
+        "monitors": [user(1)],
+        "version": 10,
+        "info_bot": None,
+        "info_user": "",
+        "team_race": False,
+        "unlisted": False,
+    }
+
+
+def main():
+    page = [race(k) for k in range(NUM_RACES)]
+    api = APIBase("http://127.0.0.1:9/")  # nothing is fetched
+
+    def decode():
+        for race_data in page:
+            api.get_instance(Race, race_data)
+
+    best = min(repeat(decode, number=10, repeat=30)) / 10
+    print(f"decode a page of {NUM_RACES} races x {NUM_ENTRANTS} entrants: {best * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
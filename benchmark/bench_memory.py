@@ -0,0 +1,43 @@
+# Copyright (c) 2023 Nanahuse
+# This software is released under the MIT License
+# https://github.com/Nanahuse/PyRacetimeGG/blob/main/LICENSE
+
+"""
+memory benchmark of holding decoded past races.
+python benchmark/bench_memory.py
+"""
+
+import gc
+import tracemalloc
+from bench_decode import NUM_ENTRANTS, race
+from pyracetimegg import Race
+from pyracetimegg.object_mapping import APIBase
+
+NUM_RACES = 4000
+
+
+def main():
+    api = APIBase("http://127.0.0.1:9/")  # nothing is fetched
+    page = [race(k) for k in range(10)]
+    for race_data in page:
+        api.get_instance(Race, race_data).entrants  # users and category are shared by all races
+
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    races = list()
+    for k in range(NUM_RACES):
+        race_data = dict(page[k % 10], name=f"smw/race-{k:06d}")
+        races.append(api.get_instance(Race, race_data))
+        races[-1].entrants
+    gc.collect()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    num_entrants = NUM_RACES * NUM_ENTRANTS
+    print(f"hold {NUM_RACES} races x {NUM_ENTRANTS} entrants: {(after - before) / 2**20:.1f} MiB")
+    print(f"  {(after - before) / num_entrants:.0f} bytes per entrant")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# Copyright (c) 2023 Nanahuse
+# This software is released under the MIT License
+# https://github.com/Nanahuse/PyRacetimeGG/blob/main/LICENSE
+
+"""
+multithreaded benchmark of decoding race pages and reading cached fields.
+python benchmark/bench_threads.py
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from bench_decode import race
+from pyracetimegg import Race, User
+from pyracetimegg.object_mapping import APIBase
+
+NUM_PAGES = 64
+THREADS = (1, 2, 4, 8, 32)
+
+
+def decode(api: APIBase, page: list[dict]):
+    for race_data in page:
+        race = api.get_instance(Race, race_data)
+        for entrant in race.entrants:
+            entrant.user.name
+
+
+def read(api: APIBase, page: list[dict]):
+    for race_data in page:
+        race = api.get_instance(Race, race_data["name"])
+        for entrant in race.entrants:
+            api.get_instance(User, entrant.user.id).name
+        race.status, race.goal, race.opened_at, race.category
+
+
+def run(num_threads: int, work, api: APIBase, pages: list[list[dict]]):
+    with ThreadPoolExecutor(num_threads) as executor:
+        start = perf_counter()
+        for _ in executor.map(lambda page: work(api, page), pages):
+            pass
+        return len(pages) / (perf_counter() - start)
+
+
+def main():
+    pages = [[race(k * 10 + i) for i in range(10)] for k in range(NUM_PAGES)]
+    print("threads  decode pages/s  read pages/s")
+    for num_threads in THREADS:
+        api = APIBase("http://127.0.0.1:9/")  # nothing is fetched
+        decoded = run(num_threads, decode, api, pages)
+        read_ = run(num_threads, read, api, pages * 4)
+        print(f"{num_threads:>7}  {decoded:>14.1f}  {read_:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
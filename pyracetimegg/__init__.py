@@ -5,4 +5,7 @@
 # flake8: noqa
 
 from .objects import Emote, Category, LeaderBoardParticipant, Goal, PastRaces, Race, User
+from .object_mapping import CachePolicy, CacheStats
+from .cache_backend import CacheBackend, SQLiteCacheBackend
 from .api import RacetimeGGAPI
+from .async_api import AsyncRacetimeGGAPI
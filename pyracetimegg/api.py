@@ -3,16 +3,52 @@
 # https://github.com/Nanahuse/PyRacetimeGG/blob/main/LICENSE
 
 import re
+from collections.abc import Iterable
+from concurrent.futures import Future
 from typing import overload
-from pyracetimegg.object_mapping import APIBase
+from pyracetimegg.object_mapping import APIBase, CacheStats, iObject
 from pyracetimegg.objects.category import Category
 from pyracetimegg.objects.race import Race
 from pyracetimegg.objects.user import User
+from pyracetimegg.utils import joint_url
+
+_Target = tuple[type[iObject], str]  # (class, id)
+
+_LOAD_TAG = {User: "name", Category: "name", Race: "slug"}  # tag loaded by fetch_xxx
 
 
 class RacetimeGGAPI(object):
-    def __init__(self, site_url: str = "https://racetime.gg/", request_per_second: int = 1) -> None:
-        self.__api = APIBase(site_url, request_per_second)
+    def __init__(self, site_url: str = "https://racetime.gg/", request_per_second: float = 1, **options) -> None:
+        """
+        Args:
+            site_url (str, optional): Defaults to "https://racetime.gg/".
+            request_per_second (float, optional): how many requests can start in a second. Defaults to 1.
+            **options: max_concurrency, pool_size, http2, burst, image_request_per_second, cache_policy and
+                cache_backend. see APIBase.
+        """
+        self.__api = APIBase(site_url, request_per_second, **options)
+        self.__router = _Router(site_url)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """
+        close pooled connections.
+        """
+        self.__api.close()
+
+    def cache_stats(self, type_: type[iObject]) -> CacheStats:
+        """
+        Args:
+            type_ (type[iObject]): User, Race or Category
+        Returns:
+            CacheStats: hit, miss and eviction counts and current size
+        """
+        return self.__api.cache_stats(type_.__name__)
 
     def search_user(self, *, name: str | None = None, discriminator: str | None = None) -> tuple[User]:
         """
@@ -29,21 +65,7 @@ class RacetimeGGAPI(object):
         Returns:
             User
         """
-        if discriminator is not None:
-            if not re.match("[0-9][0-9][0-9][0-9]", discriminator):
-                ValueError("discriminator should be a set of four digits, e.g. '0844'")
-
-        match name, discriminator:
-            case str(), str():
-                query = f"name={name}&discriminator={discriminator}"
-            case str(), None:
-                query = f"name={name}"
-            case None, str():
-                query = f"discriminator={discriminator}"
-            case _:
-                ValueError("must be set name or discriminator")
-
-        json_data = self.__api.fetch_json_from_site(f"user/search?{query}")
+        json_data = self.__api.fetch_json_from_site(f"user/search?{_search_query(name, discriminator)}")
         return tuple(self.__api.get_instance(User, tmp) for tmp in json_data["results"])
 
     def search_user_by_term(self, term: str) -> tuple[User]:
@@ -67,10 +89,9 @@ class RacetimeGGAPI(object):
         https://github.com/racetimeGG/racetime-app/wiki/Public-API-endpoints#all-races
         """
         json_data = self.__api.fetch_json_from_site("races/data")
-        for race in json_data["races"]:
-            race["ended_at"] = None
-            race["cancelled_at"] = None
-        return tuple(self.__api.get_instance(Race, tmp) for tmp in json_data["races"])
+        return tuple(
+            self.__api.get_instance(Race, {**tmp, "ended_at": None, "cancelled_at": None}) for tmp in json_data["races"]
+        )
 
     def fetch_user(self, user_id: str) -> User:
         """
@@ -80,17 +101,30 @@ class RacetimeGGAPI(object):
             user_id (str): you can find at URL
         """
         user: User = self.__api.get_instance(User, user_id)
-        user.load("name")
+        user.load("name", refresh=False)
         return user
 
     def fetch_user_by_url(self, url: str) -> User:
         try:
-            if re.fullmatch(self.__api.get_url("user", "[0-9a-zA-Z]+"), url):
-                return self.fetch_user(url.split("/")[-1])
+            type_, user_id = self.__router.route(url)
+            if type_ is User:
+                return self.fetch_user(user_id)
         except Exception:
             pass
         raise ValueError(f"wrong url: url={url}")
 
+    def fetch_users(self, user_ids: Iterable[str]) -> tuple[User | Exception]:
+        """
+        fetch users concurrently. see fetch_user.
+        same ids are fetched once and cached users are not fetched again.
+
+        Args:
+            user_ids (Iterable[str]): user ids
+        Returns:
+            tuple[User | Exception]: in the order of user_ids. exception for a user which couldn't be fetched.
+        """
+        return self.__fetch_many([(User, user_id) for user_id in user_ids])
+
     def fetch_category(self, category_slug: str) -> Category:
         """
         https://github.com/racetimeGG/racetime-app/wiki/Public-API-endpoints#category-detail
@@ -99,17 +133,29 @@ class RacetimeGGAPI(object):
             category_slug (str): you can find at URL
         """
         category: Category = self.__api.get_instance(Category, category_slug)
-        category.load("name")
+        category.load("name", refresh=False)
         return category
 
     def fetch_category_by_url(self, url: str) -> Category:
         try:
-            if re.fullmatch(self.__api.get_url("[0-9a-z-]+"), url):
-                return self.fetch_category(url.split("/")[-1])
+            type_, category_slug = self.__router.route(url)
+            if type_ is Category:
+                return self.fetch_category(category_slug)
         except Exception:
             pass
         raise ValueError(f"wrong url: url={url}")
 
+    def fetch_categories(self, category_slugs: Iterable[str]) -> tuple[Category | Exception]:
+        """
+        fetch categories concurrently. see fetch_users.
+
+        Args:
+            category_slugs (Iterable[str]): category slugs
+        Returns:
+            tuple[Category | Exception]: in the order of category_slugs.
+        """
+        return self.__fetch_many([(Category, category_slug) for category_slug in category_slugs])
+
     @overload
     def fetch_race(self, race_name: str) -> Race:
         """
@@ -132,53 +178,157 @@ class RacetimeGGAPI(object):
         ...
 
     def fetch_race(self, *args):
-        match len(args):
-            case 1:
-                if not re.fullmatch("[0-9a-z-]+/[a-z]+-[a-z]+-[0-9]+", args[0]):
-                    ValueError(
-                        """race_name is wrong. it looks like xxx/xxx-xxx-xxx.
-                        Plese check https://github.com/Nanahuse/PyRacetimeGG#how-to-know-category-slug"""
-                    )
-                name = args[0]
-            case 2:
-                if not re.fullmatch("[0-9a-z-]+", args[0]):
-                    ValueError(
-                        """category_slug is something wrong.
-                        Plese check https://github.com/Nanahuse/PyRacetimeGG#how-to-know-category-slug"""
-                    )
-                if re.fullmatch("[a-z]+-[a-z]+-[0-9]+", args[1]):
-                    ValueError(
-                        """race_slug is something wrong.
-                        Please check https://github.com/Nanahuse/PyRacetimeGG#how-to-know-race-slug"""
-                    )
-                name = f"{args[0]}/{args[1]}"
-            case _:
-                raise ValueError("args shuld be one or two")
-
-        race: Race = self.__api.get_instance(Race, name)
-        race.load("slug")
+        race: Race = self.__api.get_instance(Race, _race_name(*args))
+        race.load("slug", refresh=False)
         return race
 
     def fetch_race_by_url(self, url: str) -> Race:
         try:
-            if re.fullmatch(self.__api.get_url("[0-9a-z-]+/[a-z]+-[a-z]+-[0-9]+"), url):
-                category_slug, race_slug = url.split("/")[-2:]
-                return self.fetch_race(category_slug, race_slug)
+            type_, race_name = self.__router.route(url)
+            if type_ is Race:
+                return self.fetch_race(race_name)
         except Exception:
             pass
         raise ValueError(f"wrong url: url={url}")
 
+    def fetch_races(self, race_names: Iterable[str]) -> tuple[Race | Exception]:
+        """
+        fetch races concurrently. see fetch_users.
+
+        Args:
+            race_names (Iterable[str]): race names. it looks like xxx/xxx-xxx-xxx
+        Returns:
+            tuple[Race | Exception]: in the order of race_names.
+        """
+        return self.__fetch_many([(Race, _race_name(race_name)) for race_name in race_names])
+
     def fetch_by_url(self, url: str):
         try:
-            return self.fetch_user_by_url(url)
-        except ValueError:
+            type_, id = self.__router.route(url)
+            return {User: self.fetch_user, Category: self.fetch_category, Race: self.fetch_race}[type_](id)
+        except Exception:
             pass
+        raise ValueError(f"wrong url: url={url}")
+
+    def resolve_urls(self, urls: Iterable[str]) -> tuple[User | Category | Race | Exception]:
+        """
+        fetch objects of urls concurrently. see fetch_by_url and fetch_users.
+
+        Args:
+            urls (Iterable[str]): urls of users, categories or races
+        Returns:
+            tuple[User | Category | Race | Exception]: in the order of urls. ValueError for a wrong url.
+        """
+        return self.__fetch_many([self.__router.target(url) for url in urls])
+
+    def __fetch_many(self, targets: list[_Target | Exception]):
+        objects, to_load = _instances(self.__api, targets)
+        futures: dict[_Target, Future] = {
+            target: self.__api.executor.submit(objects[target].load, _LOAD_TAG[target[0]], False) for target in to_load
+        }
+        for target, future in futures.items():
+            try:
+                future.result()
+            except Exception as e:
+                objects[target] = e
+        return _in_order(objects, targets)
+
+
+class _Router(object):
+    """
+    url patterns of User, Category and Race. they are compiled once.
+    """
+
+    def __init__(self, site_url: str) -> None:
+        site = re.escape(joint_url(site_url, ""))
+        self.__pattern = re.compile(
+            f"{site}(?:user/(?P<user>[0-9a-zA-Z]+)|(?P<race>[0-9a-z-]+/[a-z]+-[a-z]+-[0-9]+)|(?P<category>[0-9a-z-]+))"
+        )
+
+    def route(self, url: str) -> _Target:
+        """
+        Returns:
+            tuple[type[iObject], str]: class and id of the url
+        """
+        match = self.__pattern.fullmatch(url)
+        if match is None:
+            raise ValueError(f"wrong url: url={url}")
+        match match.lastgroup:
+            case "user":
+                return User, match["user"]
+            case "race":
+                return Race, match["race"]
+            case _:
+                return Category, match["category"]
+
+    def target(self, url: str) -> _Target | ValueError:
         try:
-            return self.fetch_category_by_url(url)
-        except ValueError:
-            pass
+            return self.route(url)
+        except ValueError as e:
+            return e
+
+
+def _instances(api: APIBase, targets: list[_Target | Exception]):
+    """
+    objects of targets without duplicates, and targets which are not loaded yet.
+    """
+    objects: dict[_Target, iObject | Exception] = dict()
+    to_load: list[_Target] = list()
+    for target in targets:
+        if isinstance(target, Exception) or target in objects:
+            continue
+        type_, id = target
         try:
-            return self.fetch_race_by_url(url)
-        except ValueError:
-            pass
-        raise ValueError(f"wrong url: url={url}")
+            obj = objects[target] = api.get_instance(type_, id)
+        except Exception as e:
+            objects[target] = e
+            continue
+        if not obj._loaded(_LOAD_TAG[type_]):
+            to_load.append(target)
+    return objects, to_load
+
+
+def _in_order(objects: dict[_Target, iObject | Exception], targets: list[_Target | Exception]):
+    return tuple(target if isinstance(target, Exception) else objects[target] for target in targets)
+
+
+def _search_query(name: str | None, discriminator: str | None):
+    if discriminator is not None:
+        if not re.match("[0-9][0-9][0-9][0-9]", discriminator):
+            ValueError("discriminator should be a set of four digits, e.g. '0844'")
+
+    match name, discriminator:
+        case str(), str():
+            query = f"name={name}&discriminator={discriminator}"
+        case str(), None:
+            query = f"name={name}"
+        case None, str():
+            query = f"discriminator={discriminator}"
+        case _:
+            ValueError("must be set name or discriminator")
+    return query
+
+
+def _race_name(*args: str):
+    match len(args):
+        case 1:
+            if not re.fullmatch("[0-9a-z-]+/[a-z]+-[a-z]+-[0-9]+", args[0]):
+                ValueError(
+                    """race_name is wrong. it looks like xxx/xxx-xxx-xxx.
+                    Plese check https://github.com/Nanahuse/PyRacetimeGG#how-to-know-category-slug"""
+                )
+            return args[0]
+        case 2:
+            if not re.fullmatch("[0-9a-z-]+", args[0]):
+                ValueError(
+                    """category_slug is something wrong.
+                    Plese check https://github.com/Nanahuse/PyRacetimeGG#how-to-know-category-slug"""
+                )
+            if re.fullmatch("[a-z]+-[a-z]+-[0-9]+", args[1]):
+                ValueError(
+                    """race_slug is something wrong.
+                    Please check https://github.com/Nanahuse/PyRacetimeGG#how-to-know-race-slug"""
+                )
+            return f"{args[0]}/{args[1]}"
+        case _:
+            raise ValueError("args shuld be one or two")
@@ -0,0 +1,199 @@
+# Copyright (c) 2023 Nanahuse
+# This software is released under the MIT License
+# https://github.com/Nanahuse/PyRacetimeGG/blob/main/LICENSE
+
+import asyncio
+from collections.abc import Iterable
+from typing import overload
+from pyracetimegg.api import _LOAD_TAG, _Router, _Target, _in_order, _instances, _race_name, _search_query
+from pyracetimegg.object_mapping import AsyncAPIBase, CacheStats, iObject
+from pyracetimegg.objects.category import Category
+from pyracetimegg.objects.race import Race
+from pyracetimegg.objects.user import User
+
+
+class AsyncRacetimeGGAPI(object):
+    """
+    asyncio version of RacetimeGGAPI. httpx is required.
+
+    objects from this api can't fetch data by property access.
+    use 'await obj.aget(tag)' or 'await obj.aload()', then properties return cached data.
+    """
+
+    def __init__(self, site_url: str = "https://racetime.gg/", request_per_second: float = 1, **options) -> None:
+        """
+        Args:
+            site_url (str, optional): Defaults to "https://racetime.gg/".
+            request_per_second (float, optional): how many requests can start in a second. Defaults to 1.
+            **options: max_concurrency, pool_size, http2, burst, image_request_per_second, cache_policy and
+                cache_backend. see APIBase.
+        """
+        self.__api = AsyncAPIBase(site_url, request_per_second, **options)
+        self.__router = _Router(site_url)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def close(self):
+        """
+        close pooled connections.
+        """
+        await self.__api.aclose()
+
+    def cache_stats(self, type_: type[iObject]) -> CacheStats:
+        """
+        Args:
+            type_ (type[iObject]): User, Race or Category
+        Returns:
+            CacheStats: hit, miss and eviction counts and current size
+        """
+        return self.__api.cache_stats(type_.__name__)
+
+    async def search_user(self, *, name: str | None = None, discriminator: str | None = None) -> tuple[User]:
+        """
+        search user by name or discriminator
+        https://github.com/racetimeGG/racetime-app/wiki/Public-API-endpoints#user-search
+
+        Args:
+            name (str | None, optional):
+                user's name. head-match. case insensitive
+                Defaults to None.
+            discriminator (str | None, optional):
+                4 digits discriminator. e.g. '0844'. Exact match only.
+                Defaults to None.
+        Returns:
+            User
+        """
+        json_data = await self.__api.afetch_json_from_site(f"user/search?{_search_query(name, discriminator)}")
+        return tuple(self.__api.get_instance(User, tmp) for tmp in json_data["results"])
+
+    async def search_user_by_term(self, term: str) -> tuple[User]:
+        """
+        search user by name or partial name or (name and discriminator)
+
+        https://github.com/racetimeGG/racetime-app/wiki/Public-API-endpoints#user-search
+
+        Args:
+            term (str): term
+        Returns:
+            User
+        """
+        json_data = await self.__api.afetch_json_from_site(f"user/search?term={term}")
+        return tuple(self.__api.get_instance(User, tmp) for tmp in json_data["results"])
+
+    async def fetch_all_races(self) -> tuple[Race]:
+        """
+        all open and ongoing races
+
+        https://github.com/racetimeGG/racetime-app/wiki/Public-API-endpoints#all-races
+        """
+        json_data = await self.__api.afetch_json_from_site("races/data")
+        return tuple(
+            self.__api.get_instance(Race, {**tmp, "ended_at": None, "cancelled_at": None}) for tmp in json_data["races"]
+        )
+
+    async def fetch_user(self, user_id: str) -> User:
+        """
+        https://github.com/racetimeGG/racetime-app/wiki/Public-API-endpoints#url-fields
+
+        Args:
+            user_id (str): you can find at URL
+        """
+        user: User = self.__api.get_instance(User, user_id)
+        await user.aload("name", refresh=False)
+        return user
+
+    async def fetch_category(self, category_slug: str) -> Category:
+        """
+        https://github.com/racetimeGG/racetime-app/wiki/Public-API-endpoints#category-detail
+
+        Args:
+            category_slug (str): you can find at URL
+        """
+        category: Category = self.__api.get_instance(Category, category_slug)
+        await category.aload("name", refresh=False)
+        return category
+
+    @overload
+    async def fetch_race(self, race_name: str) -> Race:
+        """
+        https://github.com/racetimeGG/racetime-app/wiki/Public-API-endpoints#race-detail
+
+        Args:
+            race_name (str): you can find at URL.  it looks like xxx/xxx-xxx-xxx
+        """
+        ...
+
+    @overload
+    async def fetch_race(self, category_slug: str, race_slug: str) -> Race:
+        """
+        https://github.com/racetimeGG/racetime-app/wiki/Public-API-endpoints#race-detail
+
+        Args:
+            category_slug (str): you can find at URL.
+            race_slug (str): you can find at URL. it looks like xxx-xxx-xxx
+        """
+        ...
+
+    async def fetch_race(self, *args):
+        race: Race = self.__api.get_instance(Race, _race_name(*args))
+        await race.aload("slug", refresh=False)
+        return race
+
+    async def fetch_users(self, user_ids: Iterable[str]) -> tuple[User | Exception]:
+        """
+        fetch users concurrently. see fetch_user.
+        same ids are fetched once and cached users are not fetched again.
+
+        Args:
+            user_ids (Iterable[str]): user ids
+        Returns:
+            tuple[User | Exception]: in the order of user_ids. exception for a user which couldn't be fetched.
+        """
+        return await self.__fetch_many([(User, user_id) for user_id in user_ids])
+
+    async def fetch_categories(self, category_slugs: Iterable[str]) -> tuple[Category | Exception]:
+        """
+        fetch categories concurrently. see fetch_users.
+
+        Args:
+            category_slugs (Iterable[str]): category slugs
+        Returns:
+            tuple[Category | Exception]: in the order of category_slugs.
+        """
+        return await self.__fetch_many([(Category, category_slug) for category_slug in category_slugs])
+
+    async def fetch_races(self, race_names: Iterable[str]) -> tuple[Race | Exception]:
+        """
+        fetch races concurrently. see fetch_users.
+
+        Args:
+            race_names (Iterable[str]): race names. it looks like xxx/xxx-xxx-xxx
+        Returns:
+            tuple[Race | Exception]: in the order of race_names.
+        """
+        return await self.__fetch_many([(Race, _race_name(race_name)) for race_name in race_names])
+
+    async def resolve_urls(self, urls: Iterable[str]) -> tuple[User | Category | Race | Exception]:
+        """
+        fetch objects of urls concurrently. see fetch_users.
+
+        Args:
+            urls (Iterable[str]): urls of users, categories or races
+        Returns:
+            tuple[User | Category | Race | Exception]: in the order of urls. ValueError for a wrong url.
+        """
+        return await self.__fetch_many([self.__router.target(url) for url in urls])
+
+    async def __fetch_many(self, targets: list[_Target | Exception]):
+        objects, to_load = _instances(self.__api, targets)
+        results = await asyncio.gather(
+            *(objects[target].aload(_LOAD_TAG[target[0]], refresh=False) for target in to_load), return_exceptions=True
+        )
+        for target, result in zip(to_load, results):
+            if isinstance(result, Exception):
+                objects[target] = result
+        return _in_order(objects, targets)
@@ -0,0 +1,117 @@
+# Copyright (c) 2023 Nanahuse
+# This software is released under the MIT License
+# https://github.com/Nanahuse/PyRacetimeGG/blob/main/LICENSE
+
+from __future__ import annotations
+import sqlite3
+from abc import ABC, abstractmethod
+from json import dumps, loads
+from threading import Lock
+from time import time
+
+
+class CacheBackend(ABC):
+    """
+    persistent store of raw api data.
+    data is keyed by class name, id and key (url of the endpoint).
+    """
+
+    @abstractmethod
+    def load(self, class_name: str, id: str, key: str) -> dict | None:
+        """
+        Returns:
+            dict | None: json data. None if it is not stored or expired.
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def store(self, class_name: str, id: str, key: str, json_data: dict):
+        raise NotImplementedError()
+
+    @abstractmethod
+    def delete(self, class_name: str, id: str):
+        """
+        delete all data of the object.
+        """
+        raise NotImplementedError()
+
+    def close(self):
+        pass
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    CacheBackend on SQLite. thread safe.
+    """
+
+    def __init__(self, path: str = ":memory:", ttl: float | None = None, class_ttl: dict[str, float] | None = None):
+        """
+        Args:
+            path (str, optional): database file. Defaults to ":memory:".
+            ttl (float | None, optional): seconds until stored data expires. Defaults to None (forever).
+            class_ttl (dict[str, float] | None, optional): ttl of each class. it overrides ttl. Defaults to None.
+        """
+        self.__ttl = ttl
+        self.__class_ttl = dict() if class_ttl is None else dict(class_ttl)
+        self.__lock = Lock()
+        self.__connection = sqlite3.connect(path, check_same_thread=False)
+        with self.__lock, self.__connection:
+            self.__connection.execute(
+                """CREATE TABLE IF NOT EXISTS cache (
+                    class_name TEXT NOT NULL,
+                    id TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    stored_at REAL NOT NULL,
+                    PRIMARY KEY (class_name, id, key)
+                )"""
+            )
+
+    def __ttl_of(self, class_name: str):
+        return self.__class_ttl.get(class_name, self.__ttl)
+
+    def load(self, class_name: str, id: str, key: str):
+        with self.__lock:
+            row = self.__connection.execute(
+                "SELECT data, stored_at FROM cache WHERE class_name = ? AND id = ? AND key = ?",
+                (class_name, id, key),
+            ).fetchone()
+        if row is None:
+            return None
+        data, stored_at = row
+        ttl = self.__ttl_of(class_name)
+        if ttl is not None and time() - stored_at >= ttl:
+            return None
+        return loads(data)
+
+    def store(self, class_name: str, id: str, key: str, json_data: dict):
+        with self.__lock, self.__connection:
+            self.__connection.execute(
+                "INSERT OR REPLACE INTO cache (class_name, id, key, data, stored_at) VALUES (?, ?, ?, ?, ?)",
+                (class_name, id, key, dumps(json_data), time()),
+            )
+
+    def delete(self, class_name: str, id: str):
+        with self.__lock, self.__connection:
+            self.__connection.execute("DELETE FROM cache WHERE class_name = ? AND id = ?", (class_name, id))
+
+    def purge(self):
+        """
+        delete expired data.
+        """
+        now = time()
+        with self.__lock, self.__connection:
+            if self.__ttl is not None:
+                placeholders = ",".join("?" * len(self.__class_ttl))
+                self.__connection.execute(
+                    f"DELETE FROM cache WHERE stored_at <= ? AND class_name NOT IN ({placeholders})",
+                    (now - self.__ttl, *self.__class_ttl),
+                )
+            for class_name, ttl in self.__class_ttl.items():
+                self.__connection.execute(
+                    "DELETE FROM cache WHERE class_name = ? AND stored_at <= ?", (class_name, now - ttl)
+                )
+
+    def close(self):
+        with self.__lock:
+            self.__connection.close()
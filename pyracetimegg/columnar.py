@@ -0,0 +1,161 @@
+# Copyright (c) 2023 Nanahuse
+# This software is released under the MIT License
+# https://github.com/Nanahuse/PyRacetimeGG/blob/main/LICENSE
+
+from __future__ import annotations
+from datetime import timedelta
+from typing import Iterable, TYPE_CHECKING
+from pyracetimegg.objects.category import Category, LeaderBoardParticipant
+from pyracetimegg.objects.race import Race
+from pyracetimegg.utils import _numpy, strs2ms
+
+if TYPE_CHECKING:
+    import numpy
+
+ENTRANT_STATUSES = tuple(Race.Entrant.Status)  # status code => Race.Entrant.Status
+_STATUS_CODE = {status: code for code, status in enumerate(ENTRANT_STATUSES)}
+_STATUS_CODE.update({status.value: code for code, status in enumerate(ENTRANT_STATUSES)})
+
+_MILLISECOND = timedelta(milliseconds=1)
+
+
+def _code(codes: dict[str, int], key: str):
+    code = codes.get(key)
+    if code is None:
+        code = codes[key] = len(codes)
+    return code
+
+
+def _milliseconds(times: list[timedelta | str | None]):
+    """
+    int64 milliseconds. -1 for None. strings from raw json are parsed in batch.
+    """
+    np = _numpy()
+    output = np.full(len(times), -1, dtype=np.int64)
+    strings = [i for i, time in enumerate(times) if isinstance(time, str)]
+    if len(strings) != 0:
+        output[strings] = strs2ms(times[i] for i in strings)
+    for i, time in enumerate(times):
+        if isinstance(time, timedelta):
+            output[i] = time // _MILLISECOND
+    return output
+
+
+def _entrant_rows(race: Race | dict):
+    """
+    (race name, user id, status, place, finish_time, score, score_change) of each entrant
+    """
+    match race:
+        case Race():
+            for entrant in race.entrants:
+                yield (
+                    race.name,
+                    entrant.user.id,
+                    entrant.status,
+                    entrant.place,
+                    entrant.finish_time,
+                    entrant.score,
+                    entrant.score_change,
+                )
+        case dict():
+            for entrant in race["entrants"]:
+                yield (
+                    race["name"],
+                    entrant["user"]["id"],
+                    entrant["status"]["value"],
+                    entrant["place"],
+                    entrant["finish_time"],
+                    entrant["score"],
+                    entrant["score_change"],
+                )
+        case _:
+            raise TypeError(f"race should be Race or json of race. race={race}")
+
+
+def races_to_columns(races: Iterable[Race | dict]) -> dict[str, numpy.ndarray]:
+    """
+    race results as columns. one row for each entrant.
+    races can be Race, PastRaces or raw json from PastRaces.stream(decode="raw").
+
+    Args:
+        races (Iterable[Race | dict]): races
+    Returns:
+        dict[str, numpy.ndarray]:
+            "race" (int32): index of race_names
+            "user" (int32): index of user_ids
+            "status" (int8): index of ENTRANT_STATUSES
+            "place" (int32): -1 if no place
+            "finish_time_ms" (int64): -1 if not finished
+            "score" (float64): nan if no score
+            "score_change" (float64): nan if no score
+            "race_names" (str): race names
+            "user_ids" (str): user ids
+    """
+    np = _numpy()
+    race_codes: dict[str, int] = dict()
+    user_codes: dict[str, int] = dict()
+    columns = ([], [], [], [], [], [], [])
+    for race in races:
+        for race_name, user_id, status, place, finish_time, score, score_change in _entrant_rows(race):
+            columns[0].append(_code(race_codes, race_name))
+            columns[1].append(_code(user_codes, user_id))
+            columns[2].append(_STATUS_CODE[status])
+            columns[3].append(-1 if place is None else place)
+            columns[4].append(finish_time)
+            columns[5].append(np.nan if score is None else score)
+            columns[6].append(np.nan if score_change is None else score_change)
+    return {
+        "race": np.array(columns[0], dtype=np.int32),
+        "user": np.array(columns[1], dtype=np.int32),
+        "status": np.array(columns[2], dtype=np.int8),
+        "place": np.array(columns[3], dtype=np.int32),
+        "finish_time_ms": _milliseconds(columns[4]),
+        "score": np.array(columns[5], dtype=np.float64),
+        "score_change": np.array(columns[6], dtype=np.float64),
+        "race_names": np.array(list(race_codes), dtype=str),
+        "user_ids": np.array(list(user_codes), dtype=str),
+    }
+
+
+def leaderboard_to_columns(
+    leaderboard: Category | dict[str, tuple[LeaderBoardParticipant]]
+) -> dict[str, numpy.ndarray]:
+    """
+    leaderboards of a category as columns. one row for each participant of each goal.
+
+    Args:
+        leaderboard (Category | dict[str, tuple[LeaderBoardParticipant]]): category or category.leaderboard
+    Returns:
+        dict[str, numpy.ndarray]:
+            "goal" (int32): index of goals
+            "user" (int32): index of user_ids
+            "place" (int32): place
+            "score" (float64): nan if no score
+            "best_time_ms" (int64): best time
+            "times_raced" (int32): times raced
+            "goals" (str): goal names
+            "user_ids" (str): user ids
+    """
+    np = _numpy()
+    if isinstance(leaderboard, Category):
+        leaderboard = leaderboard.leaderboard
+    user_codes: dict[str, int] = dict()
+    columns = ([], [], [], [], [], [])
+    for goal_code, participants in enumerate(leaderboard.values()):
+        for participant in participants:
+            columns[0].append(goal_code)
+            columns[1].append(_code(user_codes, participant.user.id))
+            columns[2].append(participant.place)
+            columns[3].append(np.nan if participant.score is None else participant.score)
+            columns[4].append(participant.best_time)
+            columns[5].append(participant.times_raced)
+    return {
+        "goal": np.array(columns[0], dtype=np.int32),
+        "user": np.array(columns[1], dtype=np.int32),
+        "place": np.array(columns[2], dtype=np.int32),
+        "score": np.array(columns[3], dtype=np.float64),
+        "best_time_ms": _milliseconds(columns[4]),
+        "times_raced": np.array(columns[5], dtype=np.int32),
+        "goals": np.array(list(leaderboard), dtype=str),
+        "user_ids": np.array(list(user_codes), dtype=str),
+    }
@@ -3,17 +3,28 @@
 # https://github.com/Nanahuse/PyRacetimeGG/blob/main/LICENSE
 
 from __future__ import annotations
+import asyncio
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
+from hashlib import sha1
 from io import BytesIO
 from json import loads
+from sys import getsizeof, intern
 from time import time, sleep
-from threading import Lock
-from typing import Any, Iterable, overload
-from requests import get
+from threading import BoundedSemaphore, Event, Lock
+from collections.abc import Callable, Hashable, Iterable
+from typing import Any, Generic, TYPE_CHECKING, TypeVar, overload
+from weakref import WeakValueDictionary, ref
+from requests import Session
+from requests.adapters import HTTPAdapter
 from PIL import Image
 from pyracetimegg.utils import joint_url
 
+if TYPE_CHECKING:
+    from pyracetimegg.cache_backend import CacheBackend
+
 
 ID = str
 TAG = str
@@ -21,66 +32,693 @@ DATA = dict[TAG, Any]
 
 
 @dataclass(frozen=True)
+class CachePolicy(object):
+    """
+    limits of cached objects of a class.
+
+    Args:
+        max_entries: max number of objects. least recently used object is evicted. None is unlimited.
+        max_bytes: max estimated size of cached data. None is unlimited.
+        ttl: seconds until cached data goes stale. None is forever.
+        tag_ttl: ttl of each tag. it overrides ttl.
+        retain: keep cached data of objects which are no longer referenced.
+            if False, cached data is released with the last object and the limits above are not needed.
+    """
+
+    max_entries: int | None = None
+    max_bytes: int | None = None
+    ttl: float | None = None
+    tag_ttl: dict[TAG, float] = field(default_factory=dict)
+    retain: bool = True
+
+    def ttl_of(self, tag: TAG):
+        return self.tag_ttl.get(tag, self.ttl)
+
+
+@dataclass
+class CacheStats(object):
+    """
+    CAPTION: counts are approximate under heavy concurrency.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+    nbytes: int = 0
+
+
+def _estimate_size(value: Any):
+    """
+    rough size of value. items of tuple, list and dict are counted one level deep.
+    lazy value is counted by its raw json data until it is decoded.
+    """
+    if type(value) is _Lazy:
+        value = value.peek()
+    size = getsizeof(value)
+    match value:
+        case tuple() | list():
+            size += sum(getsizeof(tmp) for tmp in value)
+        case dict():
+            size += sum(getsizeof(k) + getsizeof(v) for k, v in value.items())
+    return size
+
+
+Converter = Callable[["APIBase", Any], Any]
+T = TypeVar("T")
+H = TypeVar("H", bound=Hashable)
+_MISSING = object()
+
+
+class _Lazy(object):
+    """
+    raw json data which is decoded on first access. decoded value is memoized.
+    """
+
+    __slots__ = ("__api", "__raw", "__decode", "__value", "__lock")
+
+    def __init__(self, api: APIBase, raw: Any, decode: Converter):
+        self.__api = api
+        self.__raw = raw
+        self.__decode = decode
+        self.__value = None
+        self.__lock = Lock()
+
+    def peek(self):
+        """
+        decoded value, or raw json data if it is not decoded yet.
+        """
+        return self.__value if self.__decode is None else self.__raw
+
+    def get(self):
+        if self.__decode is None:
+            return self.__value
+        with self.__lock:
+            if self.__decode is not None:
+                self.__value = self.__decode(self.__api, self.__raw)
+                # release raw data
+                self.__decode = self.__api = self.__raw = None
+        return self.__value
+
+
+def lazy(converter: Converter) -> Converter:
+    """
+    make converter lazy. json data is kept as it is and decoded on first access.
+    CAPTION: json data may be older than objects when it is decoded.
+        converter should get objects by api.get_instance(type_, data, overwrite=False) not to overwrite newer data.
+    """
+    return lambda api, value: _Lazy(api, value, converter)
+
+
+@dataclass(eq=False)
 class _Cache:
     cache: DATA = field(default_factory=dict)
-    lock_update: Lock = field(default_factory=Lock)
     _lock_chache: Lock = field(default_factory=Lock)
+    policy: CachePolicy = field(default_factory=CachePolicy)
+    space: _CacheSpace | None = field(default=None, repr=False)
+    nbytes: int = 0
+    used: bool = False  # referenced since the last eviction scan
+    _stamps: dict[TAG, tuple[float, int]] = field(default_factory=dict)  # tag -> (updated_at, size)
+    _owner: ref | None = field(default=None, repr=False)  # identity map. object which uses the cache
+    _fill_locks: dict[str, Lock] = field(default_factory=dict, repr=False)  # endpoint -> lock
+    _fetched: dict[str, float] = field(default_factory=dict, repr=False)  # endpoint -> fetched_at
+    _validators: dict[str, _Validator] = field(default_factory=dict, repr=False)  # endpoint -> validators of data
+
+    def mark_fetched(self, endpoint: str):
+        with self._lock_chache:
+            self._fetched[endpoint] = time()
+
+    def absent(self, item: TAG, endpoint: str):
+        """
+        True if the endpoint was fetched and it didn't have the tag. it is known without fetch again until ttl.
+        """
+        with self._lock_chache:
+            fetched_at = self._fetched.get(endpoint)
+            if fetched_at is None or item in self.cache:
+                return False
+            ttl = self.policy.ttl
+            return ttl is None or time() - fetched_at < ttl
+
+    def fill_lock(self, endpoint: str) -> Lock:
+        """
+        lock held while tags of the endpoint are fetched. misses of other endpoints don't wait for it.
+        """
+        lock = self._fill_locks.get(endpoint)
+        if lock is None:
+            with self._lock_chache:
+                lock = self._fill_locks.setdefault(endpoint, Lock())
+        return lock
+
+    def filling(self):
+        return any(lock.locked() for lock in list(self._fill_locks.values()))
+
+    def living(self) -> iObject | None:
+        """
+        lock-free read of the object which uses the cache. None if it has been released.
+        """
+        owner = self._owner
+        return None if owner is None else owner()
+
+    def owner(self, obj: iObject):
+        """
+        Returns:
+            iObject: living object which was registered first, or obj
+        """
+        with self._lock_chache:
+            living = None if self._owner is None else self._owner()
+            if living is None:
+                self._owner = ref(obj)
+                return obj
+            return living
+
+    def __unwrap(self, item: TAG, value: Any):
+        """
+        decode lazy value. decoded value replaces it and its size is counted again.
+        """
+        if type(value) is not _Lazy:
+            return value
+        decoded = value.get()
+        with self._lock_chache:
+            if self.cache.get(item) is not value:
+                return decoded
+            updated_at, old_size = self._stamps[item]
+            size = _estimate_size(decoded)
+            self.cache[item] = decoded
+            self._stamps[item] = (updated_at, size)
+            self.nbytes += size - old_size
+            space = self.space
+        if space is not None:
+            space.add_bytes(self, size - old_size)
+        return decoded
 
     def __getitem__(self, item: TAG):
         with self._lock_chache:
-            return self.cache[item]
+            value = self.cache[item]
+        return self.__unwrap(item, value)
+
+    def __contains__(self, item: TAG):
+        with self._lock_chache:
+            return item in self.cache
+
+    def peek(self, item: TAG):
+        """
+        lock-free read of fresh data. returns _MISSING if it has not been loaded or it is stale.
+        """
+        value = self.cache.get(item, _MISSING)
+        if value is _MISSING:
+            return _MISSING
+        ttl = self.policy.ttl_of(item)
+        if ttl is not None and time() - self._stamps.get(item, (0, 0))[0] >= ttl:
+            return _MISSING
+        if self.space is not None:
+            self.space.stats.hits += 1
+        return self.__unwrap(item, value)
 
-    def update(self, data: dict):
+    def validator(self, endpoint: str):
+        """
+        validators of the response which filled tags of the endpoint. None if the tags were written by others.
+        """
         with self._lock_chache:
-            self.cache.update(data)
+            return self._validators.get(endpoint)
+
+    def revalidated(self, endpoint: str, tags: Iterable[TAG], sent: _Validator, received: _Validator):
+        """
+        mark data of the endpoint as fresh without changing it.
+        it fails if the data was written or cleared after sent validators were read.
+
+        Returns:
+            bool: True if the data is still the one which sent validators are of.
+        """
+        with self._lock_chache:
+            if self._validators.get(endpoint) is not sent:
+                return False
+            now = time()
+            for tag in tags:
+                if tag in self._stamps:
+                    self._stamps[tag] = (now, self._stamps[tag][1])
+            self._validators[endpoint] = received
+            self._fetched[endpoint] = now
+            return True
+
+    def drop_validators(self):
+        with self._lock_chache:
+            self._validators.clear()
+
+    def get(self, item: TAG):
+        """
+        get fresh data. raise KeyError if it has not been loaded or it is stale.
+        """
+        with self._lock_chache:
+            try:
+                value = self.cache[item]
+                ttl = self.policy.ttl_of(item)
+                if ttl is not None and time() - self._stamps[item][0] >= ttl:
+                    raise KeyError(item)
+            except KeyError:
+                if self.space is not None:
+                    self.space.stats.misses += 1
+                raise
+        if self.space is not None:
+            self.space.stats.hits += 1
+        return self.__unwrap(item, value)
+
+    def update(
+        self, data: dict, endpoint: str | None = None, validator: _Validator | None = None, overwrite: bool = True
+    ):
+        """
+        Args:
+            data (dict): tag => value
+            endpoint (str | None, optional): endpoint which data is fetched from.
+                None means data is made by others (e.g. listings) and validators of every endpoint are dropped.
+            validator (_Validator | None, optional): validators of the response of the endpoint.
+            overwrite (bool, optional): if False, only tags which are not cached are written. Defaults to True.
+        """
+        with self._lock_chache:
+            if not overwrite:
+                data = {tag: value for tag, value in data.items() if tag not in self.cache}
+                if len(data) == 0:
+                    return
+            if endpoint is None:
+                self._validators.clear()
+            elif validator is None:
+                self._validators.pop(endpoint, None)
+            else:
+                self._validators[endpoint] = validator
+            now = time()
+            diff = 0
+            for tag, value in data.items():
+                size = _estimate_size(value)
+                diff += size - self._stamps.get(tag, (now, 0))[1]
+                self.cache[tag] = value
+                self._stamps[tag] = (now, size)
+            self.nbytes += diff
+            space = self.space
+        if space is not None:
+            space.add_bytes(self, diff)
 
     def clear(self):
         with self._lock_chache:
             self.cache.clear()
+            self._stamps.clear()
+            self._fetched.clear()
+            self._validators.clear()
+            diff = -self.nbytes
+            self.nbytes = 0
+            space = self.space
+        if space is not None:
+            space.add_bytes(self, diff)
+
+
+class _CacheSpace(object):
+    """
+    cached objects of a class. objects are evicted by CachePolicy in approximately least recently used order.
+    hits don't take the lock. they only mark the cache as used, and eviction gives used caches a second chance.
+    """
+
+    def __init__(self, policy: CachePolicy) -> None:
+        self.policy = policy
+        self.stats = CacheStats()
+        self.__entries: OrderedDict[ID, _Cache] = OrderedDict()
+        self.__referenced: WeakValueDictionary[ID, _Cache] = WeakValueDictionary()  # if not policy.retain
+        self.__nbytes = 0
+        self.__lock = Lock()
+
+    @property
+    def __limited(self):
+        return self.policy.max_entries is not None or self.policy.max_bytes is not None
+
+    def get(self, id: ID):
+        if not self.policy.retain:
+            with self.__lock:
+                cache = self.__referenced.get(id)
+                if cache is None:
+                    cache = self.__referenced[id] = _Cache(policy=self.policy, space=self)
+                return cache
+        cache = self.__entries.get(id)
+        if cache is not None:
+            cache.used = True
+            return cache
+        if not self.__limited:
+            # setdefault is atomic. nothing to evict.
+            return self.__entries.setdefault(id, _Cache(policy=self.policy, space=self))
+        with self.__lock:
+            cache = self.__entries.get(id)
+            if cache is None:
+                cache = self.__entries[id] = _Cache(policy=self.policy, space=self)
+                self.__evict(cache)
+            return cache
+
+    def add_bytes(self, cache: _Cache, diff: int):
+        if self.policy.max_bytes is None:
+            if cache.space is self and self.policy.retain:
+                self.__nbytes += diff  # only for stats
+            return
+        with self.__lock:
+            if cache.space is self:
+                self.__nbytes += diff
+                if diff > 0:
+                    self.__evict(cache)
+
+    def snapshot(self):
+        with self.__lock:
+            if not self.policy.retain:
+                caches = list(self.__referenced.values())
+                return CacheStats(
+                    self.stats.hits, self.stats.misses, 0, len(caches), sum(cache.nbytes for cache in caches)
+                )
+            return CacheStats(
+                self.stats.hits, self.stats.misses, self.stats.evictions, len(self.__entries), self.__nbytes
+            )
+
+    def __over_limit(self):
+        if self.policy.max_entries is not None and len(self.__entries) > self.policy.max_entries:
+            return True
+        if self.policy.max_bytes is not None and self.__nbytes > self.policy.max_bytes:
+            return True
+        return False
+
+    def __evict(self, keep: _Cache):
+        """
+        CAPTION: call with self.__lock
+        caches are evicted from the oldest. used caches get a second chance and keep and caches which are filling
+        are skipped.
+        evicted cache keeps working for objects which still have it, but it is no longer shared.
+        """
+        skips = 2 * len(self.__entries)  # stop if every cache is skipped twice
+        while skips > 0 and self.__over_limit():
+            id, cache = next(iter(self.__entries.items()))
+            if cache is keep or cache.used or cache.filling():
+                cache.used = False
+                self.__entries.move_to_end(id)
+                skips -= 1
+                continue
+            self.__entries.popitem(last=False)
+            cache.space = None
+            cache.drop_validators()
+            self.__nbytes -= cache.nbytes
+            self.stats.evictions += 1
+
+
+@dataclass(frozen=True)
+class _Validator(object):
+    etag: str | None
+    last_modified: str | None
+    digest: bytes  # hash of the body. used when the server sends no validators
+
+    def headers(self):
+        headers = dict()
+        if self.etag is not None:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified is not None:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def _read_json(response, validator: _Validator | None = None) -> tuple[dict | None, _Validator]:
+    """
+    decode the response of a conditional request. error responses raise HTTPError.
+
+    Returns:
+        tuple[dict | None, _Validator]: json data and its validators. json data is None if it has not changed since
+            validator.
+    """
+    if response.status_code == 304 and validator is not None:
+        return None, validator
+    response.raise_for_status()
+    content = response.content
+    new_validator = _Validator(
+        response.headers.get("ETag"), response.headers.get("Last-Modified"), sha1(content).digest()
+    )
+    if validator is not None and validator.digest == new_validator.digest:
+        return None, new_validator
+    return loads(content), new_validator
 
 
 class APIBase(object):
-    def __init__(self, site_url: str, request_per_second: int = 1) -> None:
+    _request_class: type[ThrottledRequest | AsyncThrottledRequest]
+
+    def __init__(
+        self,
+        site_url: str,
+        request_per_second: float = 1,
+        max_concurrency: int = 4,
+        pool_size: int | None = None,
+        http2: bool = False,
+        burst: int = 1,
+        image_request_per_second: float | None = None,
+        cache_policy: CachePolicy | dict[str, CachePolicy] | None = None,
+        cache_backend: CacheBackend | None = None,
+    ) -> None:
+        """
+        Args:
+            site_url (str): e.g. "https://racetime.gg/"
+            request_per_second (float, optional): how many requests can start in a second. Defaults to 1.
+            max_concurrency (int, optional): how many requests can be in flight at once. Defaults to 4.
+            pool_size (int | None, optional): keep-alive connections per host. Defaults to max_concurrency.
+            http2 (bool, optional): use HTTP/2. httpx[http2] is required. Defaults to False.
+            burst (int, optional): how many requests can start at once after idle. Defaults to 1.
+            image_request_per_second (float | None, optional):
+                rate of image download. images don't use api quota. Defaults to request_per_second.
+            cache_policy (CachePolicy | dict[str, CachePolicy] | None, optional):
+                limits of cached objects. one policy for all classes or dict of class name and policy.
+                e.g. {"Race": CachePolicy(max_entries=10000, ttl=3600)}. Defaults to None (unlimited).
+            cache_backend (CacheBackend | None, optional):
+                persistent store of api data. e.g. SQLiteCacheBackend("cache.db"). Defaults to None.
+        """
         self.__site_url = site_url
-        self.__throttled_request = ThrottledRequest(request_per_second)
-        self.__cache: dict[str, dict[ID, _Cache]] = dict()
+        self.__max_concurrency = max_concurrency
+        self.__executor: ThreadPoolExecutor | None = None
+        self._parent: APIBase | None = None  # api which a detached view belongs to
+        self.__cache_backend = cache_backend
+        lanes = dict() if image_request_per_second is None else {"image": TokenBucket(image_request_per_second, burst)}
+        self._throttled_request = self._request_class(
+            request_per_second, max_concurrency, pool_size, http2, burst, lanes
+        )
+        self.__cache_policy = cache_policy
+        self.__cache: dict[str, _CacheSpace] = dict()
         self.__lock = Lock()
+        self.__single_flight = _SingleFlight()
+        self.__interned: dict[Hashable, Any] = dict()
 
     @property
     def site_url(self):
         return self.__site_url
 
+    @property
+    def executor(self):
+        """
+        thread pool for concurrent fetches. it has max_concurrency workers.
+        detached view uses the pool of the api.
+        """
+        if self._parent is not None:
+            return self._parent.executor
+        with self.__lock:
+            if self.__executor is None:
+                self.__executor = ThreadPoolExecutor(self.__max_concurrency, thread_name_prefix="pyracetimegg")
+            return self.__executor
+
+    def close(self):
+        """
+        close pooled connections. detached view closes nothing. they belong to the api.
+        """
+        if self._parent is not None:
+            return
+        with self.__lock:
+            if self.__executor is not None:
+                self.__executor.shutdown(wait=False, cancel_futures=True)
+                self.__executor = None
+        self._throttled_request.close()
+
     @overload
     def get_instance(self, type_: type[iObject], id: ID):
         ...
 
     @overload
-    def get_instance(self, type_: type[iObject], data_from_api: Any):
+    def get_instance(self, type_: type[iObject], data_from_api: Any, overwrite: bool = True):
         ...
 
-    def get_instance(self, type_: type[iObject], arg: ID | Any):
+    def get_instance(self, type_: type[iObject], arg: ID | Any, overwrite: bool = True):
+        """
+        same instance is returned for the same id while it is referenced.
+        if overwrite is False, data_from_api only fills tags which the object doesn't have.
+        e.g. data decoded lazily, which may be older than the object.
+        """
         if not issubclass(type_, iObject):
             raise ValueError()
-        return type_(self, arg)
+        id = arg if isinstance(arg, ID) else type_._id_of(arg)
+        cache = self.get_cache(type_.__name__, id)
+        owner = cache.living()
+        if owner is None:
+            # wrapper is made only if no object uses the cache
+            owner = cache.owner(type_._on_cache(self, id, cache))
+        if not isinstance(arg, ID):
+            owner._update(arg, overwrite)
+        return owner
 
-    def get_cache(self, class_name: str, id: ID):
+    def __get_space(self, class_name: str):
+        space = self.__cache.get(class_name)
+        if space is not None:
+            return space
         with self.__lock:
-            return self.__cache.setdefault(class_name, dict()).setdefault(id, _Cache())
+            space = self.__cache.get(class_name)
+            if space is None:
+                match self.__cache_policy:
+                    case CachePolicy():
+                        policy = self.__cache_policy
+                    case dict():
+                        policy = self.__cache_policy.get(class_name, CachePolicy())
+                    case _:
+                        policy = CachePolicy()
+                space = self.__cache[class_name] = _CacheSpace(policy)
+            return space
+
+    def get_cache(self, class_name: str, id: ID):
+        return self.__get_space(class_name).get(id)
+
+    def intern(self, value: H) -> H:
+        """
+        shared instance of an immutable value. e.g. goals and team names repeated in many races.
+        CAPTION: the table never shrinks. don't intern values which are rarely repeated.
+
+        Args:
+            value (H): hashable and immutable value
+        Returns:
+            H: the first instance equal to value
+        """
+        if type(value) is str:
+            return intern(value)
+        return self.__interned.setdefault(value, value)
+
+    def detached(self) -> APIBase:
+        """
+        view of the api which shares connections, throttle and thread pool, but doesn't keep objects in the cache.
+        objects from the view are released with their last reference.
+        """
+        view = type(self).__new__(type(self))
+        view._init_view(self)
+        return view
+
+    def _init_view(self, parent: APIBase):
+        """
+        initialize as a detached view of parent. everything but what detached() shares is its own.
+        """
+        self.__site_url = parent.__site_url
+        self.__max_concurrency = parent.__max_concurrency
+        self.__executor = None
+        self._parent = parent
+        self.__cache_backend = parent.__cache_backend
+        self._throttled_request = parent._throttled_request
+        self.__cache_policy = CachePolicy(retain=False)
+        self.__cache = dict()
+        self.__lock = Lock()
+        self.__single_flight = _SingleFlight()
+        self.__interned = dict()  # values of the view are released with it
+
+    def cache_stats(self, class_name: str):
+        """
+        Args:
+            class_name (str): e.g. "User", "Race", "Category"
+        Returns:
+            CacheStats: hit, miss and eviction counts and current size
+        """
+        return self.__get_space(class_name).snapshot()
 
     def get_url(self, *paths: str):
         return joint_url(self.site_url, *paths)
 
     def fetch(self, url: str):
-        return self.__throttled_request.get(url)
+        return self._throttled_request.get(url)
 
     def fetch_json(self, url: str) -> dict:
         """
+        concurrent calls with the same url share one request.
+        CAPTION: returned json data is shared. don't modify it.
+
+        Args:
+            url (str): FULL_URL
+        Returns:
+            dict: json data
+        """
+        return self.__single_flight.do(url, lambda: self._throttled_request.get_json(url))
+
+    def fetch_json_if_modified(self, url: str, validator: _Validator | None = None):
+        """
+        conditional fetch with validators (ETag, Last-Modified or hash of the body) of the data which the caller has.
+        validators are kept by the caller with the data. e.g. cache of an object or a page of PastRaces.
+
         Args:
             url (str): FULL_URL
+            validator (_Validator | None, optional): validators returned with the data. None fetches it anyway.
+        Returns:
+            tuple[dict | None, _Validator]: json data and its validators.
+                json data is None if it has not changed since validator.
+        """
+
+        def _fetch():
+            headers = None if validator is None else validator.headers()
+            return _read_json(self._throttled_request.get(url, headers=headers), validator)
+
+        return self.__single_flight.do(("if_modified", url, validator), _fetch)
+
+    def fetch_object_json(
+        self,
+        class_name: str,
+        id: ID,
+        url: str,
+        refresh: bool = False,
+        validate: Callable[[dict], bool] | None = None,
+    ) -> dict:
+        """
+        fetch json data of an object. it is read from and written to cache_backend if it is set.
+
+        Args:
+            class_name (str): class name of the object
+            id (ID): id of the object
+            url (str): FULL_URL
+            refresh (bool, optional): skip stored data. Defaults to False.
+            validate (Callable[[dict], bool] | None, optional): stored data which fails this is skipped.
         Returns:
             dict: json data
         """
-        return self.__throttled_request.get_json(url)
+        json_data = self._load_stored(class_name, id, url, refresh, validate)
+        if json_data is None:
+            json_data = self.fetch_json(url)
+            self._store(class_name, id, url, json_data)
+        return json_data
+
+    def revalidate_object_json(self, class_name: str, id: ID, url: str, validator: _Validator | None = None):
+        """
+        conditional version of fetch_object_json. stored data is not used.
+
+        Returns:
+            tuple[dict | None, _Validator]: json data and its validators.
+                json data is None if it has not changed since validator.
+        """
+        json_data, validator = self.fetch_json_if_modified(url, validator)
+        if json_data is not None:
+            self._store(class_name, id, url, json_data)
+        return json_data, validator
+
+    def _load_stored(
+        self, class_name: str, id: ID, url: str, refresh: bool, validate: Callable[[dict], bool] | None
+    ) -> dict | None:
+        if self.__cache_backend is None or refresh:
+            return None
+        json_data = self.__cache_backend.load(class_name, id, url)
+        if json_data is None or (validate is not None and not validate(json_data)):
+            return None
+        return json_data
+
+    def _store(self, class_name: str, id: ID, url: str, json_data: dict):
+        if self.__cache_backend is not None:
+            self.__cache_backend.store(class_name, id, url, json_data)
+
+    def delete_stored(self, class_name: str, id: ID):
+        """
+        delete the object from cache_backend.
+        """
+        if self.__cache_backend is not None:
+            self.__cache_backend.delete(class_name, id)
 
     def fetch_json_from_site(self, *paths: str):
         """
@@ -98,10 +736,174 @@ class APIBase(object):
         Returns:
             dict: json data
         """
-        return self.__throttled_request.get_image(url)
+        return self._throttled_request.get_image(url)
+
+
+class AsyncAPIBase(APIBase):
+    """
+    APIBase for asyncio. it shares the cache and decoding with APIBase, but fetches with coroutines.
+    blocking fetch is not allowed. use iObject.aget, iObject.aload and PastRaces.aget instead.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.__in_flight: dict[Hashable, asyncio.Future] = dict()
+
+    def _init_view(self, parent: APIBase):
+        super()._init_view(parent)
+        self.__in_flight = dict()
+
+    def close(self):
+        raise RuntimeError("use 'await aclose()'")
+
+    async def aclose(self):
+        """
+        close pooled connections. detached view closes nothing.
+        """
+        if self._parent is None:
+            await self._throttled_request.close()
+
+    def fetch(self, url: str):
+        raise RuntimeError(
+            f"blocking fetch is not allowed in asyncio mode. use 'await obj.aget(tag)' or 'await obj.aload()'. url={url}"
+        )
+
+    def fetch_json(self, url: str) -> dict:
+        return self.fetch(url)
+
+    def fetch_image_from_url(self, url: str):
+        return self.fetch(url)
+
+    async def afetch(self, url: str):
+        return await self._throttled_request.get(url)
+
+    async def afetch_json(self, url: str) -> dict:
+        """
+        concurrent calls with the same url share one request.
+        CAPTION: returned json data is shared. don't modify it.
+
+        Args:
+            url (str): FULL_URL
+        Returns:
+            dict: json data
+        """
+
+        return await self.__share(url, lambda: self._throttled_request.get_json(url))
+
+    async def afetch_json_if_modified(self, url: str, validator: _Validator | None = None):
+        """
+        awaitable version of fetch_json_if_modified.
+        """
+
+        async def _fetch():
+            headers = None if validator is None else validator.headers()
+            return _read_json(await self._throttled_request.get(url, headers=headers), validator)
+
+        return await self.__share(("if_modified", url, validator), _fetch)
+
+    async def __share(self, key: Hashable, coroutine_function: Callable[[], Any]):
+        """
+        concurrent calls with the same key share one call.
+        """
+        future = self.__in_flight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(coroutine_function())
+            self.__in_flight[key] = future
+            future.add_done_callback(lambda _: self.__in_flight.pop(key, None))
+        # shield: a cancelled caller must not cancel the request of the others
+        return await asyncio.shield(future)
+
+    async def afetch_object_json(
+        self,
+        class_name: str,
+        id: ID,
+        url: str,
+        refresh: bool = False,
+        validate: Callable[[dict], bool] | None = None,
+    ) -> dict:
+        """
+        awaitable version of fetch_object_json.
+        """
+        json_data = self._load_stored(class_name, id, url, refresh, validate)
+        if json_data is None:
+            json_data = await self.afetch_json(url)
+            self._store(class_name, id, url, json_data)
+        return json_data
+
+    async def arevalidate_object_json(self, class_name: str, id: ID, url: str, validator: _Validator | None = None):
+        """
+        awaitable version of revalidate_object_json.
+        """
+        json_data, validator = await self.afetch_json_if_modified(url, validator)
+        if json_data is not None:
+            self._store(class_name, id, url, json_data)
+        return json_data, validator
+
+    async def afetch_json_from_site(self, *paths: str):
+        """
+        Args:
+            path (str): paths without site_url
+        Returns:
+            dict: json data
+        """
+        return await self.afetch_json(self.get_url(*paths))
+
+    async def afetch_image_from_url(self, url: str):
+        """
+        Args:
+            url (str): FULL_URL
+        Returns:
+            PIL.Image.Image: image
+        """
+        return await self._throttled_request.get_image(url)
+
+
+def _as_is(api: APIBase, value: Any):
+    return value
+
+
+class Field(Generic[T]):
+    """
+    field of iObject. it is declared once with the endpoint which fills it and the converter of json value.
+    the attribute name is the tag and json key.
+    """
+
+    def __init__(self, converter: Converter | None = None, endpoint: str | None = "data_url", default: Any = _MISSING):
+        """
+        Args:
+            converter (Converter | None, optional): converter(api, value). None means as it is. Defaults to None.
+            endpoint (str | None, optional):
+                name of the url attribute of the endpoint which fills the field.
+                None means the field is made without fetch. Defaults to "data_url".
+            default (Any, optional): value if the endpoint doesn't have the field. KeyError is raised if not given.
+        """
+        self.converter = converter
+        self.endpoint = endpoint
+        self.default = default
+        self.tag: TAG = ""
+
+    def __set_name__(self, owner: type, name: str):
+        self.tag = name
+
+    @overload
+    def __get__(self, obj: None, objtype: type | None = None) -> Field[T]:
+        ...
+
+    @overload
+    def __get__(self, obj: iObject, objtype: type | None = None) -> T:
+        ...
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        return obj._get(self.tag)
 
 
 class iObject(ABC):
+    __slots__ = ("_api", "__id", "__cache", "__weakref__")
+
+    _LOAD_ALL_TAGS: tuple[TAG, ...] = ()
+
     @overload
     def __init__(self, api: APIBase, id: ID):
         ...
@@ -111,87 +913,259 @@ class iObject(ABC):
         ...
 
     def __init__(self, api: APIBase, arg: ID | Any) -> None:
+        id = arg if isinstance(arg, ID) else self._id_of(arg)
+        self.__bind(api, id, api.get_cache(type(self).__name__, id))
+        if not isinstance(arg, ID):
+            self._update(arg)
+
+    def __bind(self, api: APIBase, id: ID, cache: _Cache):
         self._api = api
-        match arg:
-            case ID():
-                self.__id = arg
-                self.__cache = api.get_cache(type(self).__name__, self.id)
-            case _:
-                id, data = self._format_api_data(arg)
-                self.__id = id
-                self.__cache = api.get_cache(type(self).__name__, self.id)
-                self.__cache.update(data)
+        self.__id = id
+        self.__cache = cache
+
+    @classmethod
+    def _on_cache(cls, api: APIBase, id: ID, cache: _Cache):
+        """
+        object which uses the cache. the cache is not looked up again.
+        """
+        obj = cls.__new__(cls)
+        obj.__bind(api, id, cache)
+        return obj
 
     def __eq__(self, __value: object) -> bool:
         if type(self) is not type(__value):
             return False
         return self.id == __value.id
 
+    def __hash__(self) -> int:
+        return hash((type(self).__name__, self.__id))
+
+    def _update(self, data_from_api: Any, overwrite: bool = True):
+        """
+        update cache by data from api. if overwrite is False, cached tags are kept.
+        """
+        _, data = self._format_api_data(data_from_api)
+        self.__cache.update(data, overwrite=overwrite)
+
     @property
     def id(self):
         return self.__id
 
+    def _loaded(self, tag: TAG):
+        """
+        True if fresh tag data is in cache. nothing is fetched.
+        """
+        return self.__cache.peek(tag) is not _MISSING
+
     def clear(self):
         """
         clear itself from cache
         """
-        with self.__cache.lock_update:
-            self.__cache.clear()
+        self.__cache.clear()
+        self._api.delete_stored(type(self).__name__, self.id)
 
     def _get(self, tag: TAG):
         """
         get tag data from cache
         """
-        with self.__cache.lock_update:
+        value = self.__cache.peek(tag)
+        if value is not _MISSING:
+            return value
+        endpoint = self._endpoint_name(tag)
+        with self.__cache.fill_lock(endpoint):
             try:
-                return self.__cache[tag]
+                return self.__cache.get(tag)
             except KeyError:
                 pass
-            type(self)
-            data = self._fetch_from_api(tag)
-            self.__cache.update(data)
+            if self.__cache.absent(tag, endpoint):
+                raise KeyError(tag)
+            # stale tag is fetched from api. cache_backend has the same stale data.
+            self.__update(endpoint, self._fetch_from_api(tag, refresh=tag in self.__cache))
             return self.__cache[tag]
 
-    def load(self, tag: TAG | Iterable[TAG] | None = None):
+    async def aget(self, tag: TAG):
+        """
+        awaitable version of property access. e.g. await user.aget("name")
+        """
+        value = self.__cache.peek(tag)
+        if value is not _MISSING:
+            return value
+        try:
+            return self.__cache.get(tag)
+        except KeyError:
+            pass
+        endpoint = self._endpoint_name(tag)
+        if self.__cache.absent(tag, endpoint):
+            raise KeyError(tag)
+        self.__update(endpoint, await self._afetch_from_api(tag, refresh=tag in self.__cache))
+        return self.__cache[tag]
+
+    def load(self, tag: TAG | Iterable[TAG] | None = None, refresh: bool = True):
         """
         fetch data from api.
         if it has already loaded, it update.
         if tag is None, this func work as load_all.
         Args:
             tag : Default->None.
+            refresh : if False, data stored in cache_backend can be used. Default->True.
         """
 
-        def _fetch_tag(tag_):
-            if tag not in dir(self):
-                raise KeyError("wrong tag")
-            data = self._fetch_from_api(tag_)
-            self.__cache.update(data)
+        def _fetch_tags(endpoint_: str, tags_: list[TAG]):
+            tag_ = tags_[0]
+            if not refresh:
+                self.__update(endpoint_, self._fetch_from_api(tag_))
+                return
+            validator = self.__revalidator(endpoint_, tags_)
+            data, new_validator = self._revalidate_from_api(tag_, validator)
+            if data is None and self.__cache.revalidated(endpoint_, tags_, validator, new_validator):
+                return
+            if data is None:
+                # the cache was written by others while revalidating
+                data, new_validator = self._revalidate_from_api(tag_)
+            self.__update(endpoint_, data, new_validator)
 
+        match tag:
+            case TAG() | Iterable():
+                for endpoint, tags in self._group_by_endpoint((tag,) if isinstance(tag, TAG) else tag).items():
+                    with self.__cache.fill_lock(endpoint):
+                        _fetch_tags(endpoint, tags)
+            case None:
+                self.load_all()
+            case _:
+                raise ValueError()
+
+    async def aload(self, tag: TAG | Iterable[TAG] | None = None, refresh: bool = True):
+        """
+        awaitable version of load.
+        Args:
+            tag : Default->None.
+            refresh : if False, data stored in cache_backend can be used. Default->True.
+        """
         match tag:
             case TAG():
-                with self.__cache.lock_update:
-                    _fetch_tag(tag)
+                tags = (tag,)
             case Iterable():
-                with self.__cache.lock_update:
-                    for tmp_tag in tag:
-                        _fetch_tag(tmp_tag)
+                tags = tuple(tag)
             case None:
-                self.load_all()
+                tags = self._LOAD_ALL_TAGS
             case _:
                 raise ValueError()
+        for endpoint, tmp_tags in self._group_by_endpoint(tags).items():
+            tmp_tag = tmp_tags[0]
+            if not refresh:
+                self.__update(endpoint, await self._afetch_from_api(tmp_tag))
+                continue
+            validator = self.__revalidator(endpoint, tmp_tags)
+            data, new_validator = await self._arevalidate_from_api(tmp_tag, validator)
+            if data is None and self.__cache.revalidated(endpoint, tmp_tags, validator, new_validator):
+                continue
+            if data is None:
+                data, new_validator = await self._arevalidate_from_api(tmp_tag)
+            self.__update(endpoint, data, new_validator)
+
+    def __revalidator(self, endpoint: str, tags: list[TAG]):
+        """
+        validators sent to revalidate cached tags of the endpoint. None if some of them are not cached.
+        """
+        if not all(tag in self.__cache for tag in tags):
+            return None
+        return self.__cache.validator(endpoint)
+
+    def __update(self, endpoint: str, data: DATA, validator: _Validator | None = None):
+        """
+        store data fetched from the endpoint. fields which the endpoint doesn't have get their defaults.
+        """
+        for tag, field in self._fields().items():
+            if field.default is not _MISSING and tag not in data and self._endpoint_name(tag) == endpoint:
+                data[tag] = field.default
+        self.__cache.update(data, endpoint, validator)
+        self.__cache.mark_fetched(endpoint)
+
+    def _group_by_endpoint(self, tags: Iterable[TAG]) -> dict[str, list[TAG]]:
+        """
+        tags grouped by the endpoint which has them. each endpoint is fetched once for a group.
+        raise KeyError if a tag is wrong.
+        """
+        groups: dict[str, list[TAG]] = dict()
+        for tag in tags:
+            if tag not in dir(self):
+                raise KeyError("wrong tag")
+            groups.setdefault(self._endpoint_name(tag), list()).append(tag)
+        return groups
 
-    @abstractmethod
     def load_all(self):
         """
         fetch data from api.
         """
-        raise NotImplementedError()
+        self.load(self._LOAD_ALL_TAGS)
 
-    @abstractmethod
-    def _fetch_from_api(self, tag: TAG) -> DATA:
+    def _fetch_from_api(self, tag: TAG, refresh: bool = False) -> DATA:
         """
         fetch tag data from api.
-        return raw api data.
+        if refresh is False, data stored in cache_backend can be used.
+        """
+        url = self._endpoint(tag)
+        if url is None:
+            return self._parse_endpoint(tag, None)
+        return self._parse_endpoint(tag, self._api.fetch_object_json(type(self).__name__, self.id, url, refresh))
+
+    async def _afetch_from_api(self, tag: TAG, refresh: bool = False) -> DATA:
+        """
+        awaitable version of _fetch_from_api.
+        """
+        url = self._endpoint(tag)
+        if url is None:
+            return self._parse_endpoint(tag, None)
+        json_data = await self._api.afetch_object_json(type(self).__name__, self.id, url, refresh)
+        return self._parse_endpoint(tag, json_data)
+
+    def _revalidate_from_api(
+        self, tag: TAG, validator: _Validator | None = None
+    ) -> tuple[DATA | None, _Validator | None]:
+        """
+        conditional version of _fetch_from_api. stored data is not used.
+        data is None if the endpoint has not changed since validator.
+        """
+        url = self._endpoint(tag)
+        if url is None:
+            return self._parse_endpoint(tag, None), None
+        json_data, validator = self._api.revalidate_object_json(type(self).__name__, self.id, url, validator)
+        return None if json_data is None else self._parse_endpoint(tag, json_data), validator
+
+    async def _arevalidate_from_api(
+        self, tag: TAG, validator: _Validator | None = None
+    ) -> tuple[DATA | None, _Validator | None]:
+        """
+        awaitable version of _revalidate_from_api.
+        """
+        url = self._endpoint(tag)
+        if url is None:
+            return self._parse_endpoint(tag, None), None
+        json_data, validator = await self._api.arevalidate_object_json(type(self).__name__, self.id, url, validator)
+        return None if json_data is None else self._parse_endpoint(tag, json_data), validator
+
+    def _endpoint_name(self, tag: TAG) -> str:
+        """
+        name of the url attribute which has tag data. tag itself if it is made without api.
+        """
+        field = self._fields().get(tag)
+        if field is None:
+            return "data_url"
+        return tag if field.endpoint is None else field.endpoint
+
+    def _endpoint(self, tag: TAG) -> str | None:
+        """
+        url which has tag data.
+        None if tag data can be made without api.
+        """
+        field = self._fields().get(tag)
+        endpoint = "data_url" if field is None else field.endpoint
+        return None if endpoint is None else getattr(self, endpoint)
+
+    @abstractmethod
+    def _parse_endpoint(self, tag: TAG, json_data: dict | None) -> DATA:
+        """
+        make tag data from json data of the endpoint.
         """
         raise NotImplementedError()
 
@@ -199,34 +1173,279 @@ class iObject(ABC):
     def _format_api_data(self, data_from_api: Any) -> tuple[ID, DATA]:
         raise NotImplementedError()
 
+    @classmethod
+    @abstractmethod
+    def _id_of(cls, data_from_api: Any) -> ID:
+        """
+        id in data from api. nothing is decoded.
+        """
+        raise NotImplementedError()
 
-class ThrottledRequest(object):
-    def __init__(self, request_per_second: int) -> None:
-        self.__rate = Rate(request_per_second)
+    @classmethod
+    def _fields(cls) -> dict[TAG, Field]:
+        """
+        fields declared in the class and its bases.
+        """
+        try:
+            return cls.__dict__["_compiled_fields"]
+        except KeyError:
+            fields = dict()
+            for klass in reversed(cls.__mro__):
+                for value in vars(klass).values():
+                    if isinstance(value, Field):
+                        fields[value.tag] = value
+            cls._compiled_fields = fields
+            return fields
+
+    @classmethod
+    def _field_spec(cls) -> dict[str, Converter | None]:
+        """
+        json key => converter(api, value). None means the value is kept as it is.
+        keys which are not in the spec are ignored.
+        by default, fields filled by data_url.
+        """
+        return {tag: field.converter for tag, field in cls._fields().items() if field.endpoint == "data_url"}
+
+    @classmethod
+    def _decoders(cls) -> dict[str, Converter]:
+        """
+        field spec compiled once for each class.
+        """
+        try:
+            return cls.__dict__["_compiled_decoders"]
+        except KeyError:
+            decoders = {key: _as_is if tmp is None else tmp for key, tmp in cls._field_spec().items()}
+            cls._compiled_decoders = decoders
+            return decoders
+
+    def _decode_fields(self, data_from_api: dict) -> DATA:
+        """
+        decode json data by the field spec.
+        """
+        decoders = self._decoders()
+        api = self._api
+        return {key: decoders[key](api, value) for key, value in data_from_api.items() if key in decoders}
+
+
+@dataclass
+class _Call:
+    done: Event = field(default_factory=Event)
+    result: Any = None
+    error: BaseException | None = None
+
+
+class _SingleFlight(object):
+    """
+    concurrent calls with the same key share one call. thread safe.
+    """
+
+    def __init__(self) -> None:
+        self.__calls: dict[Hashable, _Call] = dict()
         self.__lock = Lock()
 
-    def get(self, url: str):
+    def do(self, key: Hashable, func: Callable[[], Any]):
         with self.__lock:
-            self.__rate.sleep()
-            return get(url)
+            call = self.__calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self.__calls[key] = _Call()
+
+        if not is_leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.__lock:
+                del self.__calls[key]
+            call.done.set()
+        return call.result
+
+
+class _Throttle(ABC):
+    """
+    limit how often requests start, not how long they take.
+    up to max_concurrency requests can be in flight at once.
+
+    each lane has its own token bucket. json api uses "api" lane and images use "image" lane.
+    """
+
+    def __init__(
+        self,
+        request_per_second: float,
+        max_concurrency: int = 4,
+        pool_size: int | None = None,
+        http2: bool = False,
+        burst: int = 1,
+        lanes: dict[str, TokenBucket] | None = None,
+    ) -> None:
+        """
+        Args:
+            request_per_second (float): how many requests can start in a second.
+            max_concurrency (int, optional): how many requests can be in flight at once. Defaults to 4.
+            pool_size (int | None, optional): keep-alive connections per host. Defaults to max_concurrency.
+            http2 (bool, optional): use HTTP/2. httpx[http2] is required. Defaults to False.
+            burst (int, optional): how many requests can start at once after idle. Defaults to 1.
+            lanes (dict[str, TokenBucket] | None, optional): buckets which override or add lanes. Defaults to None.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency should be 1 or more")
+        pool_size = max_concurrency if pool_size is None else pool_size
+        if pool_size < 1:
+            raise ValueError("pool_size should be 1 or more")
+        self._lanes = _make_lanes(request_per_second, burst, lanes)
+        self._in_flight = self._semaphore(max_concurrency)
+        self._client = self._open_client(pool_size, http2)
+
+    @abstractmethod
+    def _semaphore(self, max_concurrency: int):
+        """
+        Returns:
+            BoundedSemaphore | asyncio.Semaphore: limit of requests in flight
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def _open_client(self, pool_size: int, http2: bool):
+        """
+        Returns:
+            Session | httpx.Client | httpx.AsyncClient: client which keeps connections alive
+        """
+        raise NotImplementedError()
+
+
+class ThrottledRequest(_Throttle):
+    def _semaphore(self, max_concurrency: int):
+        return BoundedSemaphore(max_concurrency)
+
+    def _open_client(self, pool_size: int, http2: bool):
+        return _open_session(pool_size, http2)
+
+    def close(self):
+        self._client.close()
+
+    def get(self, url: str, lane: str = "api", headers: dict[str, str] | None = None):
+        bucket = self._lanes[lane]
+        with self._in_flight:
+            bucket.sleep()
+            return self._client.get(url, headers=headers)
 
     def get_json(self, url: str) -> dict[str, Any]:
         return loads(self.get(url).text)
 
     def get_image(self, url: str):
-        return Image.open(BytesIO(self.get(url).content))
+        return Image.open(BytesIO(self.get(url, "image").content))
+
+
+def _make_lanes(request_per_second: float, burst: int, lanes: dict[str, TokenBucket] | None):
+    output = {"api": TokenBucket(request_per_second, burst), "image": TokenBucket(request_per_second, burst)}
+    if lanes is not None:
+        output.update(lanes)
+    return output
+
+
+def _open_session(pool_size: int, http2: bool):
+    """
+    session which keeps connections alive. connections are pooled per host.
+    """
+    if http2:
+        try:
+            import httpx
+        except ImportError as e:
+            raise ImportError("http2 requires httpx. pip install httpx[http2]") from e
+        limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        return httpx.Client(http2=True, limits=limits, follow_redirects=True)
 
+    session = Session()
+    adapter = HTTPAdapter(pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
 
-class Rate(object):
-    def __init__(self, frame_rate) -> None:
-        self.__cycletime = 1 / frame_rate
-        self.__time = 0
+
+class AsyncThrottledRequest(_Throttle):
+    """
+    asyncio version of ThrottledRequest. httpx is required.
+    """
+
+    def _semaphore(self, max_concurrency: int):
+        return asyncio.Semaphore(max_concurrency)
+
+    def _open_client(self, pool_size: int, http2: bool):
+        try:
+            import httpx
+        except ImportError as e:
+            raise ImportError("asyncio mode requires httpx. pip install pyracetimegg[async]") from e
+        limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        return httpx.AsyncClient(http2=http2, limits=limits, follow_redirects=True)
+
+    async def close(self):
+        await self._client.aclose()
+
+    async def get(self, url: str, lane: str = "api", headers: dict[str, str] | None = None):
+        bucket = self._lanes[lane]
+        async with self._in_flight:
+            sleep_time = bucket.reserve()
+            if sleep_time > 0:
+                await asyncio.sleep(sleep_time)
+            return await self._client.get(url, headers=headers)
+
+    async def get_json(self, url: str) -> dict[str, Any]:
+        return loads((await self.get(url)).text)
+
+    async def get_image(self, url: str):
+        return Image.open(BytesIO((await self.get(url, "image")).content))
+
+
+class TokenBucket(object):
+    """
+    token bucket rate limiter. thread safe.
+    tokens are added at rate per second and can be saved up to burst.
+    """
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        """
+        Args:
+            rate (float): tokens per second. e.g. 2.5, 0.5
+            burst (int, optional): max tokens. Defaults to 1.
+        """
+        if rate <= 0:
+            raise ValueError("rate should be more than 0")
+        if burst < 1:
+            raise ValueError("burst should be 1 or more")
+        self.__rate = rate
+        self.__burst = burst
+        self.__tokens = float(burst)
+        self.__time = time()
+        self.__lock = Lock()
+
+    def reserve(self):
+        """
+        take a token. if there is no token, book the next one.
+
+        Returns:
+            float: seconds to wait until the token
+        """
+        with self.__lock:
+            now = time()
+            self.__tokens = min(self.__burst, self.__tokens + (now - self.__time) * self.__rate)
+            self.__time = now
+            self.__tokens -= 1  # negative tokens are booked by waiting requests
+            if self.__tokens >= 0:
+                return 0
+            return -self.__tokens / self.__rate
 
     def sleep(self):
-        time_diff = time() - self.__time
-        sleep_time = self.__cycletime - time_diff
+        sleep_time = self.reserve()
         if sleep_time > 0:
             sleep(sleep_time)
-            self.__time += self.__cycletime
-        else:
-            self.__time = time()
+
+
+APIBase._request_class = ThrottledRequest
+AsyncAPIBase._request_class = AsyncThrottledRequest
@@ -5,28 +5,45 @@
 from __future__ import annotations
 from dataclasses import dataclass
 from datetime import timedelta
-from inspect import currentframe
 from typing import TYPE_CHECKING
-from pyracetimegg.object_mapping import APIBase, iObject, ID, TAG, DATA
+from pyracetimegg.object_mapping import APIBase, Field, iObject, lazy, ID, TAG, DATA
+from pyracetimegg.objects.user import User
 from pyracetimegg.utils import str2timedelta, place2str
 
 if TYPE_CHECKING:
-    from pyracetimegg.objects.user import User
     from pyracetimegg.objects.race import Race, PastRaces, Goal
 
 
+def _users(api: APIBase, value: list[dict]):
+    return tuple(api.get_instance(User, tmp, overwrite=False) for tmp in value)
+
+
+def _goals(api: APIBase, value: list[str]):
+    from pyracetimegg.objects.race import Goal
+
+    return tuple(api.intern(Goal(goal, False)) for goal in value)
+
+
+def _races(api: APIBase, value: list[dict]):
+    from pyracetimegg.objects.race import Race
+
+    return tuple(api.get_instance(Race, race) for race in value)
+
+
+def _emotes(api: APIBase, value: dict[str, str]):
+    return tuple(Emote(emote, url, api) for emote, url in value.items())
+
+
 class Category(iObject):
+    __slots__ = ()
+
     @property
     def slug(self) -> str:
         return self.id
 
-    @property
-    def name(self) -> str:
-        return self._get(currentframe().f_code.co_name)
+    name: Field[str] = Field()
 
-    @property
-    def short_name(self) -> str:
-        return self._get(currentframe().f_code.co_name)
+    short_name: Field[str] = Field()
 
     @property
     def url(self):
@@ -37,52 +54,35 @@ class Category(iObject):
         return f"{self.url}/data"
 
     @property
-    def image(self) -> str:
-        return self._get(currentframe().f_code.co_name)
+    def leaderboard_url(self):
+        return f"{self.url}/leaderboards/data"
+
+    image: Field[str] = Field()
 
     def fetch_image(self):
         return self._api.fetch_image_from_url(self.image)
 
-    @property
-    def info(self) -> str:
-        return self._get(currentframe().f_code.co_name)
+    info: Field[str] = Field()
 
-    @property
-    def streaming_required(self) -> bool:
-        return self._get(currentframe().f_code.co_name)
+    streaming_required: Field[bool] = Field()
 
-    @property
-    def owners(self) -> tuple[User]:
-        return self._get(currentframe().f_code.co_name)
+    owners: Field[tuple[User]] = Field(lazy(_users))
 
-    @property
-    def moderators(self) -> tuple[User]:
-        return self._get(currentframe().f_code.co_name)
+    moderators: Field[tuple[User]] = Field(lazy(_users))
 
-    @property
-    def goals(self) -> tuple[Goal]:
-        return self._get(currentframe().f_code.co_name)
+    goals: Field[tuple[Goal]] = Field(_goals)
 
-    @property
-    def current_races(self) -> tuple[Race]:
-        return self._get(currentframe().f_code.co_name)
+    current_races: Field[tuple[Race]] = Field(_races)
 
-    @property
-    def emotes(self) -> tuple[Emote]:
-        return self._get(currentframe().f_code.co_name)
+    emotes: Field[tuple[Emote]] = Field(_emotes)
 
-    @property
-    def past_race(self) -> PastRaces:
-        return self._get(currentframe().f_code.co_name)
+    past_race: Field[PastRaces] = Field(endpoint=None)
 
-    @property
-    def leaderboard(self) -> dict[str, tuple[LeaderBoardParticipant]]:
-        return self._get(currentframe().f_code.co_name)
+    leaderboard: Field[dict[str, tuple[LeaderBoardParticipant]]] = Field(endpoint="leaderboard_url")
 
-    def load_all(self):
-        self.load(("past_race", "leaderboard", "id"))
+    _LOAD_ALL_TAGS = ("past_race", "leaderboard", "id")
 
-    def _fetch_from_api(self, tag: TAG) -> DATA:
+    def _parse_endpoint(self, tag: TAG, json_data: dict | None) -> DATA:
         from pyracetimegg.objects.category import LeaderBoardParticipant
 
         match tag:
@@ -91,7 +91,6 @@ class Category(iObject):
 
                 return {"past_race": PastRaces(self)}
             case "leaderboard":
-                json_data = self._api.fetch_json(f"{self.url}/leaderboards/data")
                 leaderboards = dict()
                 for leaderboard in json_data["leaderboards"]:
                     goal_name = leaderboard["goal"]
@@ -101,36 +100,19 @@ class Category(iObject):
                     )
                 return {"leaderboard": leaderboards}
             case _:
-                json_data = self._api.fetch_json(self.data_url)
                 _, data = self._format_api_data(json_data)
                 return data
 
+    @classmethod
+    def _id_of(cls, data_from_api: dict) -> ID:
+        return data_from_api["slug"]
+
     def _format_api_data(self, data_from_api: dict) -> tuple[ID, DATA]:
-        from pyracetimegg.objects.race import Race, Goal
-        from pyracetimegg.objects.user import User
+        return self._id_of(data_from_api), self._decode_fields(data_from_api)
+
 
-        id = data_from_api["slug"]
-        output = dict()
-        for key, value in data_from_api.items():
-            match key:
-                case "owners" | "moderators":
-                    output[key] = tuple(self._api.get_instance(User, tmp) for tmp in value)
-                case "goals":
-                    output[key] = tuple(Goal(goal, False) for goal in value)
-                case "current_races":
-                    output[key] = tuple(self._api.get_instance(Race, race) for race in value)
-                case "emotes":
-                    output[key] = tuple(Emote(emote, url, self._api) for emote, url in value.items())
-                case "current_races":
-                    output[key] = tuple(self._api.get_instance(Race, tmp) for tmp in value)
-                case _:
-                    if key in ("name", "short_name", "image", "info", "streaming_required"):
-                        output[key] = value
-        return id, output
-
-
-@dataclass(frozen=True)
-class Emote(iObject):
+@dataclass(frozen=True, slots=True)
+class Emote(object):
     name: str
     url: str
     _api: APIBase
@@ -145,7 +127,7 @@ class Emote(iObject):
         return self._api.fetch_image_from_url(self.url)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class LeaderBoardParticipant(object):
     user: User
     place: int
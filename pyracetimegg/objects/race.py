@@ -3,23 +3,57 @@
 # https://github.com/Nanahuse/PyRacetimeGG/blob/main/LICENSE
 
 from __future__ import annotations
+import asyncio
+from collections import OrderedDict, deque
+from collections.abc import Iterable
+from concurrent.futures import Future, as_completed
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from enum import Enum
-from inspect import currentframe
+from itertools import islice
 from threading import Lock
-from typing import Sequence, overload, TYPE_CHECKING
+from typing import Literal, Sequence, overload, TYPE_CHECKING
 from sys import maxsize
-from pyracetimegg.object_mapping import APIBase, iObject, ID, DATA, TAG
+from pyracetimegg.object_mapping import APIBase, Field, iObject, lazy, ID, DATA, TAG
+from pyracetimegg.objects.category import Category
+from pyracetimegg.objects.user import User
 from pyracetimegg.utils import str2datetime, str2timedelta, place2str
 
 if TYPE_CHECKING:
     from typing_extensions import SupportsIndex
-    from pyracetimegg.objects.user import User
-    from pyracetimegg.objects.category import Category
+    from pyracetimegg.object_mapping import _Validator
+
+
+def _datetime_or_none(api: APIBase, value: str | None):
+    return None if value is None else str2datetime(value)
+
+
+def _timedelta_or_none(api: APIBase, value: str | None):
+    return None if value is None else str2timedelta(value)
+
+
+def _user_or_none(api: APIBase, value: dict | None):
+    return None if value is None else api.get_instance(User, value)
+
+
+def _users(api: APIBase, value: list[dict]):
+    return tuple(api.get_instance(User, tmp, overwrite=False) for tmp in value)
+
+
+def _entrants(api: APIBase, value: list[dict]):
+    return tuple(Race.Entrant.from_json(api, tmp) for tmp in value)
+
+
+def _goal(api: APIBase, value: dict):
+    # custom goals are rarely repeated. they are not interned not to grow the table.
+    if value["custom"]:
+        return Goal(value["name"], True)
+    return api.intern(Goal(value["name"], False))
 
 
 class Race(iObject):
+    __slots__ = ()
+
     class Status(Enum):
         OPEN = "open"
         INVITATIONAL = "invitational"
@@ -30,12 +64,12 @@ class Race(iObject):
 
         @classmethod
         def from_str(cls, string: str):
-            for status in Race.Status:
-                if status.value == string:
-                    return status
-            raise ValueError(string)
+            try:
+                return cls._value2member_map_[string]
+            except KeyError:
+                raise ValueError(string) from None
 
-    @dataclass(frozen=True)
+    @dataclass(frozen=True, slots=True)
     class Entrant(object):
         class Status(Enum):
             REQUESTED = "requested"  # requested to join
@@ -50,10 +84,10 @@ class Race(iObject):
 
             @classmethod
             def from_str(cls, string: str):
-                for tmp in Race.Entrant.Status:
-                    if tmp.value == string:
-                        return tmp
-                raise ValueError(string)
+                try:
+                    return cls._value2member_map_[string]
+                except KeyError:
+                    raise ValueError(string) from None
 
         user: User
         team: str | None
@@ -78,9 +112,10 @@ class Race(iObject):
         def from_json(cls, api: APIBase, json_data: dict):
             from pyracetimegg.objects.user import User
 
+            team = json_data.get("team", None)
             return Race.Entrant(
-                api.get_instance(User, json_data["user"]),
-                json_data.get("team", None),
+                api.get_instance(User, json_data["user"], overwrite=False),  # decoded lazily
+                None if team is None else api.intern(team),
                 Race.Entrant.Status.from_str(json_data["status"]["value"]),
                 str2timedelta(json_data["finish_time"]) if json_data["finish_time"] is not None else None,
                 str2datetime(json_data["finished_at"]) if json_data["finished_at"] is not None else None,
@@ -93,29 +128,19 @@ class Race(iObject):
                 json_data["stream_override"],
             )
 
-    @property
-    def slug(self) -> str:
-        return self._get(currentframe().f_code.co_name)
+    slug: Field[str] = Field()
 
     @property
     def name(self):
         return self.id
 
-    @property
-    def status(self) -> Race.Status:
-        return self._get(currentframe().f_code.co_name)
+    status: Field[Race.Status] = Field(lambda api, value: Race.Status.from_str(value["value"]))
 
-    @property
-    def goal(self) -> Goal:
-        return self._get(currentframe().f_code.co_name)
+    goal: Field[Goal] = Field(_goal)
 
-    @property
-    def info(self) -> str:
-        return self._get(currentframe().f_code.co_name)
+    info: Field[str] = Field()
 
-    @property
-    def category(self) -> Category:
-        return self._get(currentframe().f_code.co_name)
+    category: Field[Category] = Field(lambda api, value: api.get_instance(Category, value))
 
     @property
     def url(self):
@@ -137,197 +162,103 @@ class Race(iObject):
     def websocket_oauth_url(self):
         return self._api.get_url("ws/o/race", self.slug)
 
-    @property
-    def version(self) -> int:
-        return self._get(currentframe().f_code.co_name)
+    version: Field[int] = Field()
 
-    @property
-    def info_bot(self) -> str:
-        return self._get(currentframe().f_code.co_name)
+    info_bot: Field[str] = Field()
 
-    @property
-    def info_user(self) -> str:
-        return self._get(currentframe().f_code.co_name)
+    info_user: Field[str] = Field()
 
-    @property
-    def team_race(self) -> bool:
-        return self._get(currentframe().f_code.co_name)
+    team_race: Field[bool] = Field()
 
     # Race info (Time)
-    @property
-    def opened_at(self) -> datetime:
-        return self._get(currentframe().f_code.co_name)
+    opened_at: Field[datetime] = Field(_datetime_or_none)
 
-    @property
-    def opened_by(self) -> User:
-        return self._get(currentframe().f_code.co_name)
+    opened_by: Field[User] = Field(_user_or_none)
 
-    @property
-    def start_delay(self) -> timedelta:
-        return self._get(currentframe().f_code.co_name)
+    start_delay: Field[timedelta] = Field(_timedelta_or_none)
 
-    @property
-    def started_at(self) -> datetime | None:
-        return self._get(currentframe().f_code.co_name)
+    started_at: Field[datetime | None] = Field(_datetime_or_none)
 
-    @property
-    def ended_at(self) -> datetime | None:
-        return self._get(currentframe().f_code.co_name)
+    ended_at: Field[datetime | None] = Field(_datetime_or_none)
 
-    @property
-    def cancelled_at(self) -> datetime | None:
-        return self._get(currentframe().f_code.co_name)
+    cancelled_at: Field[datetime | None] = Field(_datetime_or_none)
 
-    @property
-    def unlisted(self) -> bool:
-        return self._get(currentframe().f_code.co_name)
+    unlisted: Field[bool] = Field()
 
     # Race Option
-    @property
-    def time_limit(self) -> timedelta:
-        return self._get(currentframe().f_code.co_name)
+    time_limit: Field[timedelta] = Field(_timedelta_or_none)
 
-    @property
-    def time_limit_auto_complete(self) -> bool:
-        return self._get(currentframe().f_code.co_name)
+    time_limit_auto_complete: Field[bool] = Field()
 
-    @property
-    def require_even_teams(self) -> bool:
-        return self._get(currentframe().f_code.co_name)
+    require_even_teams: Field[bool] = Field()
 
-    @property
-    def streaming_required(self) -> bool:
-        return self._get(currentframe().f_code.co_name)
+    streaming_required: Field[bool] = Field()
 
-    @property
-    def auto_start(self) -> bool:
-        return self._get(currentframe().f_code.co_name)
+    auto_start: Field[bool] = Field()
 
-    @property
-    def recordable(self) -> bool:
-        return self._get(currentframe().f_code.co_name)
+    recordable: Field[bool] = Field()
 
-    @property
-    def recorded(self) -> bool:
-        return self._get(currentframe().f_code.co_name)
+    recorded: Field[bool] = Field()
 
-    @property
-    def recorded_by(self) -> User | None:
-        return self._get(currentframe().f_code.co_name)
+    recorded_by: Field[User | None] = Field(_user_or_none)
 
-    @property
-    def allow_comments(self) -> bool:
-        return self._get(currentframe().f_code.co_name)
+    allow_comments: Field[bool] = Field()
 
-    @property
-    def hide_comments(self) -> bool:
-        return self._get(currentframe().f_code.co_name)
+    hide_comments: Field[bool] = Field()
 
-    @property
-    def allow_prerace_chat(self) -> bool:
-        return self._get(currentframe().f_code.co_name)
+    allow_prerace_chat: Field[bool] = Field()
 
-    @property
-    def allow_midrace_chat(self) -> bool:
-        return self._get(currentframe().f_code.co_name)
+    allow_midrace_chat: Field[bool] = Field()
 
-    @property
-    def allow_non_entrant_chat(self) -> bool:
-        return self._get(currentframe().f_code.co_name)
+    allow_non_entrant_chat: Field[bool] = Field()
 
-    @property
-    def chat_message_delay(self) -> timedelta:
-        return self._get(currentframe().f_code.co_name)
+    chat_message_delay: Field[timedelta] = Field(_timedelta_or_none)
 
-    @property
-    def monitors(self) -> tuple[User]:
-        return self._get(currentframe().f_code.co_name)
+    monitors: Field[tuple[User]] = Field(lazy(_users))
 
-    @property
-    def entrants(self) -> tuple[Entrant]:
-        return self._get(currentframe().f_code.co_name)
+    entrants: Field[tuple[Entrant]] = Field(lazy(_entrants))
 
-    @property
-    def entrants_count(self) -> int:
-        return self._get(currentframe().f_code.co_name)
+    entrants_count: Field[int] = Field()
 
-    @property
-    def entrants_count_finished(self) -> int:
-        return self._get(currentframe().f_code.co_name)
+    entrants_count_finished: Field[int] = Field()
 
-    @property
-    def entrants_count_inactive(self) -> int:
-        return self._get(currentframe().f_code.co_name)
+    entrants_count_inactive: Field[int] = Field()
 
-    def load_all(self):
-        self._fetch_from_api("category")
+    _LOAD_ALL_TAGS = ("category",)
 
-    def _fetch_from_api(self, tag: TAG):
-        json_data = self._api.fetch_json(self.data_url)
+    def _parse_endpoint(self, tag: TAG, json_data: dict | None):
         _, data = self._format_api_data(json_data)
         return data
 
+    @classmethod
+    def _id_of(cls, data_from_api: dict) -> ID:
+        return data_from_api["name"]
+
     def _format_api_data(self, data_from_api: dict) -> tuple[ID, DATA]:
-        from pyracetimegg.objects.user import User
-        from pyracetimegg.objects.category import Category
+        id = self._id_of(data_from_api)
+        output = self._decode_fields(data_from_api)
+        category_slug, output["slug"] = id.split("/")
+        if "category" not in output:
+            output["category"] = self._api.get_instance(Category, {"slug": category_slug})
+        return id, output
 
-        output = dict()
-        id = data_from_api["name"]
-        category_slug, slug = id.split("/")
-        data_from_api.setdefault("category", {"slug": category_slug})
-        data_from_api["slug"] = slug
-
-        for key, value in data_from_api.items():
-            match key:
-                case "status":
-                    output[key] = Race.Status.from_str(value["value"])
-                case "goal":
-                    output[key] = Goal(value["name"], value["custom"])
-                case "opened_at" | "started_at" | "ended_at" | "cancelled_at":
-                    output[key] = str2datetime(value) if value is not None else None
-                case "time_limit" | "start_delay" | "chat_message_delay":
-                    output[key] = str2timedelta(value) if value is not None else None
-                case "category":
-                    output[key] = self._api.get_instance(Category, value)
-                case "opened_by" | "recorded_by":
-                    if value is None:
-                        output[key] = None
-                    else:
-                        output[key] = self._api.get_instance(User, value)
-                case "monitors":
-                    output[key] = tuple(self._api.get_instance(User, tmp) for tmp in value)
-                case "entrants":
-                    output[key] = tuple(Race.Entrant.from_json(self._api, tmp) for tmp in value)
-                case _:
-                    if key in (
-                        "slug",
-                        "info",
-                        "version",
-                        "info_bot",
-                        "info_user",
-                        "team_race",
-                        "unlisted",
-                        "time_limit_auto_complete",
-                        "require_even_teams",
-                        "streaming_required",
-                        "auto_start",
-                        "recordable",
-                        "recorded",
-                        "allow_comments",
-                        "hide_comments",
-                        "allow_prerace_chat",
-                        "allow_midrace_chat",
-                        "allow_non_entrant_chat",
-                        "entrants_count",
-                        "entrants_count_finished",
-                        "entrants_count_inactive",
-                    ):
-                        output[key] = value
 
-        return id, output
+class _Page(list):
+    """
+    races of a page and validators of the response which filled it.
+    """
+
+    __slots__ = ("validator",)
+
+    def __init__(self) -> None:
+        super().__init__([None] * 10)
+        self.validator: _Validator | None = None
 
 
 class PastRaces(Sequence[Race]):
+    read_ahead: int = 4  # how many pages are fetched ahead while iterating
+    max_pages: int | None = None  # how many pages are kept in memory. least recently used pages are evicted.
+
     def __init__(self, obj: Category | User) -> None:
         from pyracetimegg.objects.user import User
         from pyracetimegg.objects.category import Category
@@ -342,29 +273,388 @@ class PastRaces(Sequence[Race]):
                 raise ValueError()
         self.__lock = Lock()
         with self.__lock:
-            self.__race_cache: list[Race | None] | None = None
+            self.__pages: OrderedDict[int, _Page] | None = None  # page number => races
+            self.__length = 0
+            self.__count = 0
+            self.__positions: dict[str, int] = dict()  # race name => index
+            self.__num_loaded = 0
+
+    def __page_url(self, page_num: int):
+        return self.__api.get_url(self._base_path, f"races/data?show_entrants=yes&page={page_num}")
+
+    def __is_current(self, json_data: dict):
+        """
+        stored page is used only if it belongs to the same listing as the first page.
+        """
+        return self.__pages is None or json_data["count"] == self.__count
+
+    def __fetch_json(self, page_num: int, refresh: bool = False):
+        return self.__api.fetch_object_json(
+            type(self).__name__, self._base_path, self.__page_url(page_num), refresh, self.__is_current
+        )
+
+    async def __afetch_json(self, page_num: int, refresh: bool = False):
+        return await self.__api.afetch_object_json(
+            type(self).__name__, self._base_path, self.__page_url(page_num), refresh, self.__is_current
+        )
+
+    def __revalidate_json(self, page_num: int, validator: _Validator | None = None):
+        return self.__api.revalidate_object_json(
+            type(self).__name__, self._base_path, self.__page_url(page_num), validator
+        )
+
+    async def __arevalidate_json(self, page_num: int, validator: _Validator | None = None):
+        return await self.__api.arevalidate_object_json(
+            type(self).__name__, self._base_path, self.__page_url(page_num), validator
+        )
+
+    def __page_validator(self, page_num: int):
+        """
+        validators of the filled page. None if it is not filled or it is filled by others than its response.
+        """
+        with self.__lock:
+            if not self.__page_filled(page_num):
+                return None
+            return self.__pages[page_num].validator
+
+    def __keep_page(self, page_num: int, sent: _Validator | None, received: _Validator):
+        """
+        keep the page which has not changed since sent validators.
+
+        Returns:
+            bool: False if the page was evicted, shifted or filled again after sent validators were read.
+        """
+        with self.__lock:
+            page = None if self.__pages is None else self.__pages.get(page_num)
+            if sent is None or page is None or page.validator is not sent:
+                return False
+            page.validator = received
+            return True
+
+    def __set_first_page(self, json_data: dict, validator: _Validator | None = None):
+        """
+        CAPTION: call with self.__lock
+        """
+        if self.__pages is not None:
+            return
+        self.__count = json_data["count"]
+        self.__length = json_data["count"]
+        self.__pages = OrderedDict()
+        self.__positions = dict()
+        self.__num_loaded = 0
+        self.__set_page(1, json_data, validator)
+
+    def __num_pages(self):
+        return (self.__length + 9) // 10
+
+    def __page_filled(self, page_num: int):
+        """
+        lock-free read of a snapshot. pages may be replaced while it is read.
+        """
+        pages = self.__pages
+        page = None if pages is None else pages.get(page_num)
+        return page is not None and None not in page[: self.__length - (page_num - 1) * 10]
+
+    def __peek(self, index: int):
+        page = self.__pages.get(index // 10 + 1)
+        return None if page is None else page[index % 10]
 
-    def __fetch_json(self, page_num: int):
-        return self.__api.fetch_json_from_site(self._base_path, f"races/data?show_entrants=yes&page={page_num}")
+    def __race_at(self, index: int):
+        page_num = index // 10 + 1
+        with self.__lock:
+            page = None if self.__pages is None else self.__pages.get(page_num)
+            if page is None:
+                return None
+            self.__pages.move_to_end(page_num)
+            return page[index % 10]
+
+    def __put(self, index: int, race: Race):
+        """
+        CAPTION: call with self.__lock
+        """
+        page_num = index // 10 + 1
+        page = self.__pages.get(page_num)
+        if page is None:
+            page = self.__pages[page_num] = _Page()
+        if page[index % 10] is None:
+            self.__num_loaded += 1
+        page[index % 10] = race
+        self.__positions[race.id] = index
+        if index >= self.__length:
+            # the listing has grown while paging.
+            self.__length = index + 1
+
+    def __evict(self):
+        """
+        CAPTION: call with self.__lock
+        """
+        # the first page is kept for refresh in addition to max_pages.
+        while self.max_pages is not None and len(self.__pages) - (1 in self.__pages) > max(self.max_pages, 1):
+            page_num = next(page_num for page_num in self.__pages if page_num != 1)
+            page = self.__pages.pop(page_num)
+            for index, race in enumerate(page, (page_num - 1) * 10):
+                if race is None:
+                    continue
+                self.__num_loaded -= 1
+                if self.__positions.get(race.id) == index:
+                    del self.__positions[race.id]
+
+    def __set_page(self, page_num: int, json_data: dict, validator: _Validator | None = None):
+        """
+        CAPTION: call with self.__lock
+
+        Returns:
+            _Page | None: races of the page
+        """
+        for index, race_data in enumerate(json_data["races"], (page_num - 1) * 10):
+            self.__put(index, self.__api.get_instance(Race, race_data))
+        page = self.__pages.get(page_num)
+        if page is not None:
+            page.validator = validator
+            self.__pages.move_to_end(page_num)
+            self.__evict()
+        return page
+
+    def __lookup(self, name: str):
+        """
+        index of the race in loaded pages.
+        """
+        index = self.__positions.get(name)
+        if index is None:
+            return None
+        race = self.__race_at(index)
+        if race is None or race.id != name:
+            return None
+        return index
+
+    def __chunks(self, pages: list[int]):
+        """
+        split pages not to exceed max_pages.
+        """
+        size = len(pages) if self.max_pages is None else max(self.max_pages - 1, 1)
+        return (pages[i : i + size] for i in range(0, len(pages), size))
+
+    def __missing_pages(self):
+        return [page_num for page_num in range(1, self.__num_pages() + 1) if not self.__page_filled(page_num)]
+
+    def __load_page(self, page_num: int):
+        json_data = self.__fetch_json(page_num)
+        with self.__lock:
+            return self.__set_page(page_num, json_data)
+
+    async def __aload_page(self, page_num: int):
+        json_data = await self.__afetch_json(page_num)
+        with self.__lock:
+            return self.__set_page(page_num, json_data)
+
+    def __load_pages(self, pages: Iterable[int], refresh: bool = False, revalidate: bool = False):
+        """
+        fetch pages concurrently. each page is decoded as soon as it arrives.
+        if revalidate is True, filled pages which have not changed are kept.
+        """
+
+        def _fetch(page_num: int):
+            if not refresh:
+                return self.__fetch_json(page_num), None, None
+            sent = self.__page_validator(page_num) if revalidate else None
+            return *self.__revalidate_json(page_num, sent), sent
+
+        futures = {self.__api.executor.submit(_fetch, page_num): page_num for page_num in pages}
+        for future in as_completed(futures):
+            page_num = futures[future]
+            json_data, validator, sent = future.result()
+            if json_data is None and self.__keep_page(page_num, sent, validator):
+                continue
+            if json_data is None:
+                # the page was changed by others while revalidating
+                json_data, validator = self.__revalidate_json(page_num)
+            with self.__lock:
+                self.__set_page(page_num, json_data, validator)
+
+    async def __aload_pages(self, pages: Iterable[int], refresh: bool = False, revalidate: bool = False):
+        """
+        awaitable version of __load_pages.
+        """
+
+        async def _load(page_num: int):
+            if not refresh:
+                json_data, validator = await self.__afetch_json(page_num), None
+            else:
+                sent = self.__page_validator(page_num) if revalidate else None
+                json_data, validator = await self.__arevalidate_json(page_num, sent)
+                if json_data is None and self.__keep_page(page_num, sent, validator):
+                    return
+                if json_data is None:
+                    json_data, validator = await self.__arevalidate_json(page_num)
+            with self.__lock:
+                self.__set_page(page_num, json_data, validator)
+
+        await asyncio.gather(*(_load(page_num) for page_num in pages))
 
     def __init_list(self):
         with self.__lock:
-            if self.__race_cache is not None:
+            if self.__pages is not None:
                 return
-            json_data = self.__fetch_json(1)
-            self.__race_cache: list[Race | None] = [None] * json_data["count"]
-            for i, race in enumerate(json_data["races"]):
-                self.__race_cache[i] = self.__api.get_instance(Race, race)
+            self.__set_first_page(self.__fetch_json(1))
+
+    async def __ainit_list(self):
+        if self.__pages is not None:
+            return
+        json_data = await self.__afetch_json(1)
+        with self.__lock:
+            self.__set_first_page(json_data)
+
+    def __normalize_index(self, item: int):
+        length = self.__length
+        if item < -length:
+            raise IndexError()
+        elif item < 0:
+            return length + item
+        elif item < length:
+            return item
+        else:
+            raise IndexError()
 
     def load(self):
         """
         CAPTION: All data will be loaded. Take a large amount of time.
-        If data has loaded, reload
+        If data has loaded, reload. pages which have not changed are kept without decoding.
+        Pages are fetched concurrently.
         """
-        self.clear()
-        self.__init_list()
-        for _ in self:
-            pass
+        json_data = None
+        sent = self.__page_validator(1)
+        if sent is not None:
+            json_data, validator = self.__revalidate_json(1, sent)
+            if json_data is None and self.__keep_page(1, sent, validator):
+                self.__load_pages(range(2, self.__num_pages() + 1), refresh=True, revalidate=True)
+                return
+
+        # the first page has changed. every race may have shifted.
+        if json_data is None:
+            json_data, validator = self.__revalidate_json(1)
+        with self.__lock:
+            self.__pages = None
+            self.__set_first_page(json_data, validator)
+        self.__load_pages(range(2, self.__num_pages() + 1), refresh=True)
+
+    async def aload(self):
+        """
+        awaitable version of load.
+        CAPTION: All data will be loaded. Take a large amount of time.
+        """
+        json_data = None
+        sent = self.__page_validator(1)
+        if sent is not None:
+            json_data, validator = await self.__arevalidate_json(1, sent)
+            if json_data is None and self.__keep_page(1, sent, validator):
+                await self.__aload_pages(range(2, self.__num_pages() + 1), refresh=True, revalidate=True)
+                return
+
+        if json_data is None:
+            json_data, validator = await self.__arevalidate_json(1)
+        with self.__lock:
+            self.__pages = None
+            self.__set_first_page(json_data, validator)
+        await self.__aload_pages(range(2, self.__num_pages() + 1), refresh=True)
+
+    def __head_pages(self, json_data: dict):
+        """
+        pages which contain new races and the first known race.
+        """
+        return range(2, (json_data["count"] - self.__count) // 10 + 2)
+
+    def __overlaps(self, head_pages: dict[int, dict], added: int):
+        """
+        whether loaded races are found at the shifted positions in head pages.
+        """
+        matched = False
+        for page_num, json_data in head_pages.items():
+            if json_data["count"] != self.__count + added:
+                return False
+            for i, race in enumerate(json_data["races"], (page_num - 1) * 10 - added):
+                known = self.__peek(i) if 0 <= i < self.__length else None
+                if known is None:
+                    continue
+                if known.id != race["name"]:
+                    return False
+                matched = True
+        return matched
+
+    def __apply_head(self, head_pages: dict[int, dict], validator: _Validator):
+        """
+        put new races at the head and shift loaded races. validators of shifted pages are dropped.
+        if loaded races are not found in head pages, loaded races are cleared.
+        CAPTION: call with self.__lock
+
+        Args:
+            head_pages (dict[int, dict]): page number => json data
+            validator (_Validator): validators of the first page
+        """
+        added = head_pages[1]["count"] - self.__count
+        if added < 0 or not self.__overlaps(head_pages, added):
+            self.__pages = None
+            self.__set_first_page(head_pages[1], validator)
+            return None
+
+        pages = self.__pages
+        self.__pages = OrderedDict()
+        self.__length += added
+        self.__count += added
+        self.__positions = dict()
+        self.__num_loaded = 0
+        for page_num, page in pages.items():
+            for index, race in enumerate(page, (page_num - 1) * 10):
+                if race is not None:
+                    self.__put(index + added, race)
+        for page_num, json_data in head_pages.items():
+            self.__set_page(page_num, json_data, validator if page_num == 1 else None)
+        self.__evict()
+        return added
+
+    def refresh(self) -> int | None:
+        """
+        fetch only races newer than the last sync. loaded races are kept and shifted.
+
+        Returns:
+            int | None: number of new races. they are at the head (past_race[:n]).
+                None if it can't sync incrementally (nothing has loaded or loaded races are not found).
+                then loaded races are cleared and fetched on demand.
+        """
+        if self.__pages is None:
+            self.__init_list()
+            return None
+        sent = self.__page_validator(1)
+        json_data, validator = self.__revalidate_json(1, sent)
+        if json_data is None and self.__keep_page(1, sent, validator):
+            return 0
+        if json_data is None:
+            json_data, validator = self.__revalidate_json(1)
+        pages = self.__head_pages(json_data)
+        head_pages = {1: json_data}
+        head_pages.update(
+            zip(pages, self.__api.executor.map(lambda page_num: self.__fetch_json(page_num, True), pages))
+        )
+        with self.__lock:
+            return self.__apply_head(head_pages, validator)
+
+    async def arefresh(self) -> int | None:
+        """
+        awaitable version of refresh.
+        """
+        if self.__pages is None:
+            await self.__ainit_list()
+            return None
+        sent = self.__page_validator(1)
+        json_data, validator = await self.__arevalidate_json(1, sent)
+        if json_data is None and self.__keep_page(1, sent, validator):
+            return 0
+        if json_data is None:
+            json_data, validator = await self.__arevalidate_json(1)
+        pages = self.__head_pages(json_data)
+        head_pages = {1: json_data}
+        head_pages.update(zip(pages, await asyncio.gather(*(self.__afetch_json(page_num, True) for page_num in pages))))
+        with self.__lock:
+            return self.__apply_head(head_pages, validator)
 
     @property
     def have_loaded(self):
@@ -372,10 +662,48 @@ class PastRaces(Sequence[Race]):
         have all race been loaded
 
         Returns:
-            _type_: _description_
+            bool: True if all races have been loaded
+        """
+        self.__init_list()
+        return self.__num_loaded >= self.__length
+
+    def find(self, value: Race | str, load: bool = True) -> int | None:
+        """
+        index of the race. loaded pages are looked up first.
+
+        Args:
+            value (Race | str): race or race name. e.g. "smw/xxx-xxx-1234"
+            load (bool, optional):
+                if the race is not in loaded pages, missing pages are loaded.
+                if False, only loaded pages are looked up. Defaults to True.
+        Returns:
+            int | None: index. None if not found.
         """
+        name = value.id if isinstance(value, Race) else value
         self.__init_list()
-        return None in self.__race_cache
+        index = self.__lookup(name)
+        if index is None and load and not self.have_loaded:
+            for pages in self.__chunks(self.__missing_pages()):
+                self.__load_pages(pages)
+                index = self.__lookup(name)
+                if index is not None:
+                    break
+        return index
+
+    async def afind(self, value: Race | str, load: bool = True) -> int | None:
+        """
+        awaitable version of find.
+        """
+        name = value.id if isinstance(value, Race) else value
+        await self.__ainit_list()
+        index = self.__lookup(name)
+        if index is None and load and self.__num_loaded < self.__length:
+            for pages in self.__chunks(self.__missing_pages()):
+                await self.__aload_pages(pages)
+                index = self.__lookup(name)
+                if index is not None:
+                    break
+        return index
 
     @overload
     def __getitem__(self, item: int) -> Race:
@@ -389,77 +717,311 @@ class PastRaces(Sequence[Race]):
         self.__init_list()
         match item:
             case int():
-                length = len(self)
-                if item < -length:
-                    raise IndexError()
-                elif item < 0:
-                    index = length + item
-                elif item < length:
-                    index = item
-                else:
-                    raise IndexError()
-
-                with self.__lock:
-                    if self.__race_cache[index] is not None:
-                        return self.__race_cache[index]
-                    else:
-                        i_page = index // 10 + 1  # 0-9 => 1, 10-19 => 2, ...
-                        json_data = self.__fetch_json(i_page)
-
-                        for i, race in enumerate(json_data["races"]):
-                            try:
-                                self.__race_cache[(i_page - 1) * 10 + i] = self.__api.get_instance(Race, race)
-                            except IndexError:
-                                self.__race_cache.append(self.__api.get_instance(Race, race))
-                        return self.__race_cache[index]
+                index = self.__normalize_index(item)
+                race = self.__race_at(index)
+                if race is not None:
+                    return race
+                return self.__race_in(self.__load_page(index // 10 + 1), index)  # 0-9 => 1, 10-19 => 2, ...
             case slice():
                 start, stop, step = item.indices(len(self))
                 return tuple(self[index] for index in range(start, stop, step))
 
+    @staticmethod
+    def __race_in(page: list[Race | None] | None, index: int):
+        race = None if page is None else page[index % 10]
+        if race is None:
+            # the listing has shrunk since the length was known.
+            raise IndexError()
+        return race
+
+    def __read_ahead(self, read_ahead: int | None):
+        read_ahead = self.read_ahead if read_ahead is None else read_ahead
+        if self.max_pages is not None:
+            # don't evict pages fetched ahead before reading them.
+            read_ahead = min(read_ahead, self.max_pages - 1)
+        return max(read_ahead, 0)
+
     def __iter__(self):
+        return self.iterate()
+
+    def iterate(self, read_ahead: int | None = None):
+        """
+        iterate races in order. next pages are fetched in background while reading the current page.
+
+        Args:
+            read_ahead (int | None, optional): how many pages are fetched ahead. Defaults to self.read_ahead.
+        """
         self.__init_list()
-        i = 0
-        while True:
-            try:
-                yield self[i]
-            except IndexError:
-                break
-            i += 1
+        read_ahead = self.__read_ahead(read_ahead)
+        futures: dict[int, Future] = dict()
+        try:
+            i = 0
+            while True:
+                if i % 10 == 0:
+                    page_num = i // 10 + 1
+                    for ahead in range(page_num, min(page_num + read_ahead, self.__num_pages()) + 1):
+                        if ahead not in futures and not self.__page_filled(ahead):
+                            futures[ahead] = self.__api.executor.submit(self.__load_page, ahead)
+                    future = futures.pop(page_num, None)
+                    if future is not None:
+                        future.result()
+                try:
+                    race = self[i]
+                except IndexError:
+                    break
+                yield race
+                i += 1
+        finally:
+            for future in futures.values():
+                future.cancel()
+
+    async def aget(self, item: int) -> Race:
+        """
+        awaitable version of self[item]
+        """
+        await self.__ainit_list()
+        index = self.__normalize_index(item)
+        race = self.__race_at(index)
+        if race is not None:
+            return race
+        return self.__race_in(await self.__aload_page(index // 10 + 1), index)
+
+    async def alen(self) -> int:
+        """
+        awaitable version of len(self)
+        """
+        await self.__ainit_list()
+        return self.__length
+
+    def __aiter__(self):
+        return self.aiterate()
+
+    async def aiterate(self, read_ahead: int | None = None):
+        """
+        awaitable version of iterate.
+        """
+        await self.__ainit_list()
+        read_ahead = self.__read_ahead(read_ahead)
+        tasks: dict[int, asyncio.Future] = dict()
+        try:
+            i = 0
+            while True:
+                if i % 10 == 0:
+                    page_num = i // 10 + 1
+                    for ahead in range(page_num, min(page_num + read_ahead, self.__num_pages()) + 1):
+                        if ahead not in tasks and not self.__page_filled(ahead):
+                            tasks[ahead] = asyncio.ensure_future(self.__aload_page(ahead))
+                    task = tasks.pop(page_num, None)
+                    if task is not None:
+                        await task
+                try:
+                    race = await self.aget(i)
+                except IndexError:
+                    break
+                yield race
+                i += 1
+        finally:
+            for task in tasks.values():
+                task.cancel()
+
+    def __stream_decoder(self, decode: Literal["raw", "objects"]):
+        match decode:
+            case "raw":
+                return lambda races: races
+            case "objects":
+                api = self.__api.detached()
+                return lambda races: tuple(Race(api, race) for race in races)
+            case _:
+                raise ValueError(f"decode should be 'raw' or 'objects'. decode={decode}")
+
+    def stream(
+        self,
+        pages: Iterable[int] | None = None,
+        decode: Literal["raw", "objects"] = "raw",
+        read_ahead: int | None = None,
+    ):
+        """
+        yield races page by page without caching. for bulk export.
+        nothing is kept in this list, the object cache or the cache backend.
+
+        Args:
+            pages (Iterable[int] | None, optional): page numbers from 1. Defaults to None (all pages).
+            decode (str, optional):
+                "raw": list of race json. decoding is skipped.
+                "objects": tuple of Race which are not kept in the cache.
+                Defaults to "raw".
+            read_ahead (int | None, optional): how many pages are fetched ahead. Defaults to self.read_ahead.
+        Yields:
+            list[dict] | tuple[Race]: races of a page. newest first.
+        """
+        decoder = self.__stream_decoder(decode)
+        read_ahead = self.read_ahead if read_ahead is None else read_ahead
+
+        def _fetch(page_num: int) -> dict:
+            return self.__api.fetch(self.__page_url(page_num)).json()
+
+        if pages is None:
+            json_data = _fetch(1)
+            pages = range(2, (json_data["count"] + 9) // 10 + 1)
+            yield decoder(json_data["races"])
+
+        pages = iter(pages)
+        futures: deque[Future] = deque(
+            self.__api.executor.submit(_fetch, page_num) for page_num in islice(pages, read_ahead + 1)
+        )
+        try:
+            while futures:
+                json_data = futures.popleft().result()
+                futures.extend(self.__api.executor.submit(_fetch, page_num) for page_num in islice(pages, 1))
+                yield decoder(json_data["races"])
+        finally:
+            for future in futures:
+                future.cancel()
+
+    async def astream(
+        self,
+        pages: Iterable[int] | None = None,
+        decode: Literal["raw", "objects"] = "raw",
+        read_ahead: int | None = None,
+    ):
+        """
+        awaitable version of stream.
+        """
+        decoder = self.__stream_decoder(decode)
+        read_ahead = self.read_ahead if read_ahead is None else read_ahead
+
+        async def _fetch(page_num: int) -> dict:
+            return (await self.__api.afetch(self.__page_url(page_num))).json()
+
+        if pages is None:
+            json_data = await _fetch(1)
+            pages = range(2, (json_data["count"] + 9) // 10 + 1)
+            yield decoder(json_data["races"])
+
+        pages = iter(pages)
+        tasks: deque[asyncio.Future] = deque(
+            asyncio.ensure_future(_fetch(page_num)) for page_num in islice(pages, read_ahead + 1)
+        )
+        try:
+            while tasks:
+                json_data = await tasks.popleft()
+                tasks.extend(asyncio.ensure_future(_fetch(page_num)) for page_num in islice(pages, 1))
+                yield decoder(json_data["races"])
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def __bisect(self, dt: datetime, high: int | None = None):
+        """
+        index of the first race opened before dt in [0, high). races are ordered from the newest.
+        """
+        low, high = 0, len(self) if high is None else high
+        while low < high:
+            mid = (low + high) // 2
+            if self[mid].opened_at < dt:
+                high = mid
+            else:
+                low = mid + 1
+        return low
+
+    async def __abisect(self, dt: datetime, high: int | None = None):
+        low, high = 0, await self.alen() if high is None else high
+        while low < high:
+            mid = (low + high) // 2
+            if (await self.aget(mid)).opened_at < dt:
+                high = mid
+            else:
+                low = mid + 1
+        return low
+
+    def __chunks_between(self, first: int, stop: int):
+        """
+        Yields:
+            tuple[list[int], range]: pages which are not filled and indexes of races in them.
+        """
+        for pages in self.__chunks(list(range(first // 10 + 1, (stop - 1) // 10 + 2))):
+            indexes = range(max(first, (pages[0] - 1) * 10), min(stop, pages[-1] * 10))
+            yield [page_num for page_num in pages if not self.__page_filled(page_num)], indexes
+
+    def between(self, start: datetime | None, end: datetime | None = None) -> tuple[Race]:
+        """
+        races opened in [start, end).
+        boundaries are found by binary search over pages, then only pages in the range are fetched.
+
+        Args:
+            start (datetime | None): timezone aware datetime. None means from the oldest race.
+            end (datetime | None, optional): timezone aware datetime. None means until now. Defaults to None.
+        Returns:
+            tuple[Race]: newest first
+        """
+        self.__init_list()
+        stop = len(self) if start is None else self.__bisect(start)
+        first = 0 if end is None else self.__bisect(end, stop)
+        races: list[Race] = list()
+        # races are read chunk by chunk. pages are not evicted before they are read.
+        for pages, indexes in self.__chunks_between(first, stop):
+            self.__load_pages(pages)
+            races.extend(self[index] for index in indexes)
+        return tuple(races)
+
+    def since(self, dt: datetime) -> tuple[Race]:
+        """
+        races opened at dt or later. see between.
+        """
+        return self.between(dt)
+
+    async def abetween(self, start: datetime | None, end: datetime | None = None) -> tuple[Race]:
+        """
+        awaitable version of between.
+        """
+        await self.__ainit_list()
+        stop = self.__length if start is None else await self.__abisect(start)
+        first = 0 if end is None else await self.__abisect(end, stop)
+        races: list[Race] = list()
+        for pages, indexes in self.__chunks_between(first, stop):
+            await self.__aload_pages(pages)
+            races.extend([await self.aget(index) for index in indexes])
+        return tuple(races)
+
+    async def asince(self, dt: datetime) -> tuple[Race]:
+        """
+        awaitable version of since.
+        """
+        return await self.abetween(dt)
 
     def __contains__(self, key: object) -> bool:
         """
-        CAPTION: All data will be loaded. Take a large amount of time.
+        CAPTION: If the race is not in loaded pages, all data will be loaded. Take a large amount of time.
         """
-        if not self.have_loaded:
-            self.load()
-        return key in self.__race_cache
+        if not isinstance(key, (Race, str)):
+            return False
+        return self.find(key) is not None
 
     def __len__(self):
         self.__init_list()
-        return len(self.__race_cache)
+        return self.__length
 
-    def index(self, value: Race, start: SupportsIndex = 0, stop: SupportsIndex = maxsize) -> int:
+    def index(self, value: Race | str, start: SupportsIndex = 0, stop: SupportsIndex = maxsize) -> int:
         """
-        CAPTION: All data will be loaded. Take a large amount of time.
+        CAPTION: If the race is not in loaded pages, all data will be loaded. Take a large amount of time.
         """
-        if not self.have_loaded:
-            self.load()
-        return self.__race_cache.index(value, start, stop)
+        index = self.find(value) if isinstance(value, (Race, str)) else None
+        if index is None or index not in range(self.__length)[start:stop]:
+            raise ValueError(f"{value} is not in past races")
+        return index
 
-    def count(self, value: Race) -> int:
+    def count(self, value: Race | str) -> int:
         """
-        CAPTION: All data will be loaded. Take a large amount of time.
+        CAPTION: If the race is not in loaded pages, all data will be loaded. Take a large amount of time.
         """
-        if not self.have_loaded:
-            self.load()
-        return self.__race_cache.count(value)
+        return 1 if value in self else 0
 
     def clear(self):
         with self.__lock:
-            self.__race_cache = None
+            self.__pages = None
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Goal(object):
     name: str
     custom: bool
@@ -5,16 +5,17 @@
 from __future__ import annotations
 from dataclasses import dataclass
 from enum import Enum
-from inspect import currentframe
 from PIL.Image import Image
 from typing import TYPE_CHECKING
-from pyracetimegg.object_mapping import iObject, ID, TAG, DATA
+from pyracetimegg.object_mapping import Field, iObject, ID, TAG, DATA
 
 if TYPE_CHECKING:
     from pyracetimegg.objects.race import PastRaces
 
 
 class User(iObject):
+    __slots__ = ()
+
     class Pronouns(Enum):
         NONE = "none"
         SHE_HER = "she/her"
@@ -25,15 +26,15 @@ class User(iObject):
         OTHER_ASK = "other/ask!"
 
         @classmethod
-        def from_str(cls, string: str):
-            for pronouns in User.Pronouns:
-                if pronouns.value == string:
-                    return pronouns
+        def from_str(cls, string: str | None):
             if string is None:
                 return User.Pronouns.NONE
-            raise ValueError(string)
+            try:
+                return cls._value2member_map_[string]
+            except KeyError:
+                raise ValueError(string) from None
 
-    @dataclass(frozen=True)
+    @dataclass(frozen=True, slots=True)
     class _Stats(object):
         joined: int = 0
         first: int = 0
@@ -49,96 +50,52 @@ class User(iObject):
     def data_url(self):
         return f"{self.url}/data"
 
-    @property
-    def name(self) -> str:
-        return self._get(currentframe().f_code.co_name)
-
-    @property
-    def discriminator(self) -> str:
-        return self._get(currentframe().f_code.co_name)
+    name: Field[str] = Field()
+    discriminator: Field[str] = Field()
 
     @property
     def full_name(self):
         return f"{self.name}#{self.discriminator}"
 
-    @property
-    def avatar(self) -> str:
-        return self._get(currentframe().f_code.co_name)
+    avatar: Field[str | None] = Field(default=None)
 
     def fetch_avatar_image(self) -> Image:
         return self._api.fetch_image_from_url(self.avatar)
 
-    @property
-    def pronouns(self) -> str:
-        return self._get(currentframe().f_code.co_name)
-
-    @property
-    def flair(self) -> str:
-        return self._get(currentframe().f_code.co_name)
-
-    @property
-    def twitch_name(self) -> str:
-        return self._get(currentframe().f_code.co_name)
+    pronouns: Field[Pronouns] = Field(lambda api, value: User.Pronouns.from_str(value), default=Pronouns.NONE)
+    flair: Field[str] = Field(default="")
+    twitch_name: Field[str | None] = Field(default=None)
 
     @property
     def twitch_channel(self):
         return f"https://www.twitch.tv/{self.twitch_name}"
 
-    @property
-    def twitch_display_name(self) -> str:
-        return self._get(currentframe().f_code.co_name)
-
-    @property
-    def can_moderate(self) -> bool:
-        return self._get(currentframe().f_code.co_name)
-
-    @property
-    def teams(self) -> tuple[str]:
-        return self._get(currentframe().f_code.co_name)
+    twitch_display_name: Field[str | None] = Field(default=None)
+    can_moderate: Field[bool] = Field()
+    teams: Field[tuple[str]] = Field(
+        lambda api, value: tuple(map(api.intern, value)) if value is not None else tuple(), default=tuple()
+    )
+    stats: Field[_Stats] = Field(lambda api, value: User._Stats(**value) if value is not None else _NO_STATS)
+    past_race: Field[PastRaces] = Field(endpoint=None)
 
-    @property
-    def stats(self) -> _Stats:
-        return self._get(currentframe().f_code.co_name)
+    _LOAD_ALL_TAGS = ("past_race", "id")
 
-    @property
-    def past_race(self) -> PastRaces:
-        return self._get(currentframe().f_code.co_name)
-
-    def load_all(self):
-        self.load(("past_race", "id"))
-
-    def _fetch_from_api(self, tag: TAG):
+    def _parse_endpoint(self, tag: TAG, json_data: dict | None):
         match tag:
             case "past_race":
                 from pyracetimegg.objects.race import PastRaces
 
                 return {"past_race": PastRaces(self)}
             case _:
-                json_data = self._api.fetch_json(self.data_url)
-                json_data.setdefault("stats", None)
-                _, data = self._format_api_data(json_data)
+                _, data = self._format_api_data({"stats": None, **json_data})
                 return data
 
+    @classmethod
+    def _id_of(cls, data_from_api: dict) -> ID:
+        return data_from_api["id"]
+
     def _format_api_data(self, data_from_api: dict) -> tuple[ID, DATA]:
-        output = dict()
-        id = data_from_api["id"]
-        for key, value in data_from_api.items():
-            match key:
-                case "pronouns":
-                    output[key] = User.Pronouns.from_str(value)
-                case "teams":
-                    output[key] = tuple(tmp for tmp in value) if value is not None else tuple()
-                case "stats":
-                    output[key] = User._Stats(**value) if value is not None else User._Stats()
-                case _:
-                    if key in (
-                        "name",
-                        "discriminator",
-                        "avatar",
-                        "flair",
-                        "twitch_name",
-                        "twitch_display_name",
-                        "can_moderate",
-                    ):
-                        output[key] = value
-        return id, output
+        return self._id_of(data_from_api), self._decode_fields(data_from_api)
+
+
+_NO_STATS = User._Stats()
@@ -2,6 +2,8 @@
 # This software is released under the MIT License
 # https://github.com/Nanahuse/PyRacetimeGG/blob/main/LICENSE
 
+import re
+from collections.abc import Iterable
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 
@@ -37,23 +39,88 @@ def parse(string: str, parsers: tuple[str]):
         yield string
 
 
+_UTC = ZoneInfo("UTC")
+_DURATION = re.compile(r"P(\d+)DT(\d+)H(\d+)M(\d+)(?:\.(\d{0,3})\d*)?S")
+
+
 def str2datetime(string: str):
-    if "." in string:
-        year, month, day, hour, min, second, micro = parse(string, ("-", "-", "T", ":", ":", ".", "Z"))
-    else:
-        year, month, day, hour, min, second = parse(string, ("-", "-", "T", ":", ":", "Z"))
-        micro = "0"
+    # e.g. 2022-03-20T11:50:38.007Z
+    # fraction is truncated to milliseconds like strs2datetime64. ".5" is 500 ms.
+    fraction = string[20:-1] if string[19] == "." else "0"
     return datetime(
-        int(year), int(month), int(day), int(hour), int(min), int(second), int(micro[:3]), tzinfo=ZoneInfo("UTC")
+        int(string[0:4]),
+        int(string[5:7]),
+        int(string[8:10]),
+        int(string[11:13]),
+        int(string[14:16]),
+        int(string[17:19]),
+        int(fraction[:3].ljust(3, "0")) * 1000,
+        tzinfo=_UTC,
     )
 
 
 def str2timedelta(string: str):
-    if "." in string:
-        day, hour, min, second, milli = parse(string[1:], ("DT", "H", "M", ".", "S"))
-    else:
-        day, hour, min, second = parse(string[1:], ("DT", "H", "M", "S"))
-        milli = "0"
-    return timedelta(
-        days=int(day), hours=int(hour), minutes=int(min), seconds=int(second), milliseconds=int(milli[:3])
-    )
+    # e.g. P0DT00H18M07.497596S
+    # fraction is truncated to milliseconds like strs2ms. "07.5S" is 7500 ms.
+    day, hour, min, second, milli = _DURATION.fullmatch(string).groups("")
+    return timedelta(int(day), (int(hour) * 60 + int(min)) * 60 + int(second), 0, int(milli.ljust(3, "0")))
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError("numpy is required. pip install pyracetimegg[numpy]") from e
+    return numpy
+
+
+def strs2datetime64(strings: Iterable[str | None]):
+    """
+    batch version of str2datetime.
+
+    Args:
+        strings (Iterable[str | None]): e.g. ["2022-03-20T11:50:38.007Z", None]
+    Returns:
+        numpy.ndarray: datetime64[ms] in UTC. NaT for None.
+    """
+    np = _numpy()
+    return np.array(["NaT" if string is None else string.rstrip("Z") for string in strings], dtype="datetime64[ms]")
+
+
+def strs2ms(strings: Iterable[str | None]):
+    """
+    batch version of str2timedelta in milliseconds.
+
+    Args:
+        strings (Iterable[str | None]): e.g. ["P0DT00H18M07.497596S", None]
+    Returns:
+        numpy.ndarray: int64 milliseconds. -1 for None.
+    """
+    np = _numpy()
+    strings = list(strings)
+    present = np.array([string is not None for string in strings], dtype=bool)
+    parts = _DURATION.findall("\n".join(string for string in strings if string is not None))
+    if len(parts) != present.sum():
+        raise ValueError("some strings are not ISO 8601 duration")
+    output = np.full(len(strings), -1, dtype=np.int64)
+    if len(parts) == 0:
+        return output
+    parts = np.array(parts)
+    day, hour, min, second = parts[:, :4].astype(np.int64).T
+    milli = np.char.ljust(parts[:, 4], 3, "0").astype(np.int64)
+    output[present] = (((day * 24 + hour) * 60 + min) * 60 + second) * 1000 + milli
+    return output
+
+
+def strs2timedelta64(strings: Iterable[str | None]):
+    """
+    batch version of str2timedelta.
+
+    Args:
+        strings (Iterable[str | None]): e.g. ["P0DT00H18M07.497596S", None]
+    Returns:
+        numpy.ndarray: timedelta64[ms]. NaT for None.
+    """
+    np = _numpy()
+    milliseconds = strs2ms(strings)
+    return np.where(milliseconds < 0, np.timedelta64("NaT"), milliseconds.astype("timedelta64[ms]"))
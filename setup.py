@@ -5,6 +5,7 @@ setup(
     version="2.3.0",
     packages=find_packages(),
     install_requires=["Pillow>=9.5.0", "requests>=2.31.0", "tzdata"],
+    extras_require={"async": ["httpx"], "http2": ["httpx[http2]"], "numpy": ["numpy"]},
     license="MIT",
     url="https://github.com/Nanahuse/PyRacetimeGG",
     classifiers=[
@@ -0,0 +1,156 @@
+# Copyright (c) 2023 Nanahuse
+# This software is released under the MIT License
+# https://github.com/Nanahuse/PyRacetimeGG/blob/main/LICENSE
+
+from datetime import datetime, timedelta, timezone
+from threading import Lock
+import pytest
+
+
+def _json_handler(respond):
+    """
+    handler class which replies respond(path) = (status, body). body is bytes or json data.
+    """
+    from http.server import BaseHTTPRequestHandler
+    from json import dumps
+
+    class JSONHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            status, body = respond(self.path)
+            if not isinstance(body, bytes):
+                body = dumps(body).encode()
+            if status == 304:
+                body = b""
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return JSONHandler
+
+
+@pytest.fixture
+def serve():
+    """
+    start local http server. serve(respond) returns the base url.
+    respond(path) returns (status, body). body is bytes or json data.
+    a handler class can be given instead, for tests which look at the raw request.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from threading import Thread
+
+    servers = []
+
+    def _serve(respond):
+        handler_class = respond if isinstance(respond, type) and issubclass(respond, BaseHTTPRequestHandler) else None
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler_class or _json_handler(respond))
+        Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_port}/"
+
+    yield _serve
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+class FakeSite(object):
+    """
+    racetime.gg which serves category "smw" and its past races.
+    races are ordered from the newest like racetime.gg. race k is opened at T0 + k days.
+    """
+
+    T0 = datetime(2023, 1, 1, tzinfo=timezone.utc)
+
+    def __init__(self, num_races: int) -> None:
+        self.num_races = 0
+        self.races: list[dict] = list()
+        self.paths: list[str] = list()
+        self.latency = 0.0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = Lock()
+        self.add_races(num_races)
+
+    def race(self, k: int):
+        opened_at = self.T0 + timedelta(days=k)
+        return {
+            "name": f"smw/fake-race-{k:04d}",
+            "status": {"value": "finished"},
+            "goal": {"name": "Any%", "custom": False},
+            "info": f"race {k}",
+            "opened_at": opened_at.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+            "opened_by": {"id": f"user{k % 5}", "name": f"User{k % 5}", "discriminator": "0001"},
+            "entrants": [],
+        }
+
+    def add_races(self, num: int):
+        with self.lock:
+            self.races[:0] = [self.race(k) for k in range(self.num_races + num - 1, self.num_races - 1, -1)]
+            self.num_races += num
+
+    def remove_races(self, num: int):
+        with self.lock:
+            del self.races[:num]
+            self.num_races -= num
+
+    def page_requests(self) -> list[int]:
+        """
+        requested page numbers of the race listing in order.
+        """
+        with self.lock:
+            return [int(path.rsplit("page=", 1)[1]) for path in self.paths if "/races/data" in path]
+
+    def clear_requests(self):
+        with self.lock:
+            self.paths.clear()
+
+    def respond(self, path: str):
+        from time import sleep
+
+        with self.lock:
+            self.paths.append(path)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        sleep(self.latency)
+        try:
+            return self.__respond(path)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+    def __respond(self, path: str):
+        from urllib.parse import parse_qs, urlparse
+
+        url = urlparse(path)
+        with self.lock:
+            races = list(self.races)
+        if url.path == "/smw/races/data":
+            page = int(parse_qs(url.query)["page"][0])
+            page_races = races[(page - 1) * 10 : page * 10]
+            return 200, {"count": len(races), "num_pages": (len(races) + 9) // 10, "races": page_races}
+        if url.path == "/smw/data":
+            return 200, {"name": "Super Mario World", "short_name": "SMW", "slug": "smw", "goals": ["Any%"]}
+        for race in races:
+            if url.path == f"/{race['name']}/data":
+                return 200, race
+        return 404, {}
+
+
+@pytest.fixture
+def fake_site(serve):
+    """
+    fake_site(num_races) returns (base url, FakeSite).
+    """
+
+    def _fake_site(num_races: int = 35):
+        site = FakeSite(num_races)
+        return serve(site.respond), site
+
+    return _fake_site
@@ -54,3 +54,102 @@ def test_fetch_by_url():
     test_race = api.fetch_race_by_url("https://racetime.gg/smw/comic-baby-9383")
     race = api.fetch_race("smw/comic-baby-9383")
     assert test_race == race
+
+
+def test_async_api():
+    import asyncio
+    import pytest
+
+    pytest.importorskip("httpx")
+    from pyracetimegg import AsyncRacetimeGGAPI
+
+    async def main():
+        async with AsyncRacetimeGGAPI() as async_api:
+            user = await async_api.fetch_user("xldAMBlqvY3aOP57")
+            assert user.name == "Nanahuse"
+            category = await async_api.fetch_category("smw")
+            assert category.name == "Super Mario World"
+            race = await async_api.fetch_race("smw", "comic-baby-9383")
+            assert race.goal.name == "Small Only"
+            past_race = await category.aget("past_race")
+            assert (await past_race.aget(10)).name == past_race[10].name
+
+    asyncio.run(main())
+
+
+def test_fetch_users(serve):
+    from pyracetimegg import User
+
+    requested_paths = []
+
+    def respond(path):
+        requested_paths.append(path)
+        if path == "/user/bad/data":
+            return 404, {}
+        user_id = path.split("/")[2]
+        return 200, {"id": user_id, "name": user_id.upper()}
+
+    url = serve(respond)
+    local_api = RacetimeGGAPI(url, request_per_second=100)
+    users = local_api.fetch_users(["a", "bad", "b", "a"])
+    assert [user.name for user in (users[0], users[2], users[3])] == ["A", "B", "A"]
+    assert users[0] is users[3]
+    assert isinstance(users[1], Exception)
+    assert sorted(requested_paths) == ["/user/a/data", "/user/b/data", "/user/bad/data"]
+
+    resolved = local_api.resolve_urls([f"{url}user/b", f"{url}smw/comic-baby-9383", "https://example.com/"])
+    assert resolved[0] is users[2]
+    assert isinstance(resolved[1], Exception)  # race isn't served
+    assert isinstance(resolved[2], ValueError)
+    assert len(requested_paths) == 4
+
+
+def test_router():
+    import pytest
+    from pyracetimegg import Category, Race, User
+    from pyracetimegg.api import _Router
+
+    router = _Router("https://racetime.gg/")
+    assert router.route("https://racetime.gg/user/xldAMBlqvY3aOP57") == (User, "xldAMBlqvY3aOP57")
+    assert router.route("https://racetime.gg/smw") == (Category, "smw")
+    assert router.route("https://racetime.gg/smw/comic-baby-9383") == (Race, "smw/comic-baby-9383")
+    with pytest.raises(ValueError):
+        router.route("https://racetimexgg/smw")
+
+
+def test_async_api_offline(fake_site):
+    import asyncio
+    import pytest
+
+    pytest.importorskip("httpx")
+    from pyracetimegg import AsyncRacetimeGGAPI
+    from pyracetimegg.object_mapping import AsyncAPIBase
+
+    url, site = fake_site(35)
+
+    async def main():
+        async with AsyncRacetimeGGAPI(url, request_per_second=100) as async_api:
+            category = await async_api.fetch_category("smw")
+            assert await category.aget("short_name") == "SMW"
+            race = await async_api.fetch_race("smw/fake-race-0003")
+            assert await race.aget("info") == "race 3"
+
+            past_race = await category.aget("past_race")
+            names = [race.name async for race in past_race]
+            assert names == [f"smw/fake-race-{k:04d}" for k in range(34, -1, -1)]
+            assert sorted(site.page_requests()) == [1, 2, 3, 4]
+            assert (await past_race.aget(31)) is race
+
+            site.add_races(1)
+            await past_race.aload()
+            assert (await past_race.aget(0)).name == "smw/fake-race-0035"
+            assert await past_race.alen() == 36
+
+        api_base = AsyncAPIBase(url, 100)
+        site.clear_requests()
+        data = await asyncio.gather(*(api_base.afetch_json(f"{url}smw/data") for _ in range(3)))
+        assert data[0] is data[1] is data[2]
+        assert site.paths == ["/smw/data"]
+        await api_base.aclose()
+
+    asyncio.run(main())
@@ -0,0 +1,57 @@
+# Copyright (c) 2023 Nanahuse
+# This software is released under the MIT License
+# https://github.com/Nanahuse/PyRacetimeGG/blob/main/LICENSE
+
+
+def test_sqlite_backend(tmp_path):
+    from time import sleep
+    from pyracetimegg.cache_backend import SQLiteCacheBackend
+
+    path = str(tmp_path / "cache.db")
+    backend = SQLiteCacheBackend(path, class_ttl={"Race": 0.1})
+    backend.store("User", "xldAMBlqvY3aOP57", "url", {"name": "Nanahuse"})
+    backend.store("Race", "smw/comic-baby-9383", "url", {"name": "smw/comic-baby-9383"})
+    backend.close()
+
+    backend = SQLiteCacheBackend(path, class_ttl={"Race": 0.1})
+    assert backend.load("User", "xldAMBlqvY3aOP57", "url") == {"name": "Nanahuse"}
+    assert backend.load("User", "xldAMBlqvY3aOP57", "other_url") is None
+    sleep(0.15)
+    assert backend.load("Race", "smw/comic-baby-9383", "url") is None
+    backend.purge()
+    backend.delete("User", "xldAMBlqvY3aOP57")
+    assert backend.load("User", "xldAMBlqvY3aOP57", "url") is None
+
+
+def test_warm_restart():
+    from pyracetimegg import User
+    from pyracetimegg.cache_backend import SQLiteCacheBackend
+    from pyracetimegg.object_mapping import APIBase
+
+    backend = SQLiteCacheBackend()
+    offline_api = APIBase("http://127.0.0.1:9/", cache_backend=backend)  # nothing is listening
+    user_data = {"id": "xldAMBlqvY3aOP57", "name": "Nanahuse", "discriminator": "2723", "pronouns": None}
+    backend.store("User", "xldAMBlqvY3aOP57", "http://127.0.0.1:9/user/xldAMBlqvY3aOP57/data", user_data)
+
+    user = offline_api.get_instance(User, "xldAMBlqvY3aOP57")
+    assert user.full_name == "Nanahuse#2723"
+    assert user.stats == User._Stats()
+
+
+def test_stale_tag_skips_backend(serve):
+    from time import sleep
+    from pyracetimegg import CachePolicy, User
+    from pyracetimegg.cache_backend import SQLiteCacheBackend
+    from pyracetimegg.object_mapping import APIBase
+
+    names = iter(["Before", "After"])
+
+    def respond(path):
+        return 200, {"id": "a", "name": next(names), "discriminator": "0001"}
+
+    url = serve(respond)
+    local_api = APIBase(url, 100, cache_policy=CachePolicy(ttl=0.1), cache_backend=SQLiteCacheBackend())
+    user = local_api.get_instance(User, "a")
+    assert user.name == "Before"
+    sleep(0.15)
+    assert user.name == "After"  # not the stale json stored in the backend
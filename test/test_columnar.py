@@ -0,0 +1,59 @@
+# Copyright (c) 2023 Nanahuse
+# This software is released under the MIT License
+# https://github.com/Nanahuse/PyRacetimeGG/blob/main/LICENSE
+
+import pytest
+
+
+def _entrant(user_id: str, status: str, place: int | None, finish_time: str | None, score_change: int | None):
+    return {
+        "user": {"id": user_id, "name": user_id},
+        "status": {"value": status},
+        "finish_time": finish_time,
+        "finished_at": None,
+        "place": place,
+        "score": None if score_change is None else 1000,
+        "score_change": score_change,
+        "comment": None,
+        "has_comment": False,
+        "stream_live": False,
+        "stream_override": False,
+    }
+
+
+RACE_DATA = (
+    {
+        "name": "smw/comic-baby-9383",
+        "entrants": [
+            _entrant("user_a", "done", 1, "P0DT00H18M07.497596S", 12),
+            _entrant("user_b", "dnf", None, None, -3),
+        ],
+    },
+    {
+        "name": "smw/lucky-mario-0001",
+        "entrants": [_entrant("user_b", "done", 1, "P0DT01H00M07.5S", None)],
+    },
+)
+
+
+def test_races_to_columns():
+    np = pytest.importorskip("numpy")
+    from pyracetimegg import Race
+    from pyracetimegg.columnar import ENTRANT_STATUSES, races_to_columns
+    from pyracetimegg.object_mapping import APIBase
+
+    offline_api = APIBase("http://127.0.0.1:9/")  # nothing is listening
+    races = [offline_api.get_instance(Race, race) for race in RACE_DATA]
+
+    for columns in (races_to_columns(races), races_to_columns(RACE_DATA)):
+        assert columns["race_names"][columns["race"]].tolist() == [
+            "smw/comic-baby-9383",
+            "smw/comic-baby-9383",
+            "smw/lucky-mario-0001",
+        ]
+        assert columns["user_ids"][columns["user"]].tolist() == ["user_a", "user_b", "user_b"]
+        assert [ENTRANT_STATUSES[code].value for code in columns["status"]] == ["done", "dnf", "done"]
+        assert columns["place"].tolist() == [1, -1, 1]
+        assert columns["finish_time_ms"].tolist() == [1087497, -1, 3607500]  # same for Race and raw json
+        assert columns["score_change"][:2].tolist() == [12, -3]
+        assert np.isnan(columns["score_change"][2])
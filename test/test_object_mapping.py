@@ -2,16 +2,509 @@
 # This software is released under the MIT License
 # https://github.com/Nanahuse/PyRacetimeGG/blob/main/LICENSE
 
+import pytest
 
-def test_rate():
-    from pyracetimegg.object_mapping import Rate
-    from time import time
 
-    frame_rate = 10
-    rate = Rate(frame_rate)
+def test_throttled_request_concurrency(serve):
+    from threading import Barrier, BrokenBarrierError, Thread
+    from pyracetimegg.object_mapping import ThrottledRequest
 
+    # every request waits until 4 requests are in flight. serial requests would break the barrier.
+    barrier = Barrier(4, timeout=10)
+
+    def respond(path):
+        try:
+            barrier.wait()
+        except BrokenBarrierError:
+            return 503, {}
+        return 200, {"ok": True}
+
+    url = serve(respond)
+    request = ThrottledRequest(10, max_concurrency=4)
+    results = []
+    threads = [Thread(target=lambda: results.append(request.get(url).status_code)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [200] * 4
+
+
+def test_throttled_request_keep_alive(serve):
+    from http.server import BaseHTTPRequestHandler
+    from pyracetimegg.object_mapping import ThrottledRequest
+
+    client_ports = set()
+
+    class KeepAliveHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            client_ports.add(self.client_address[1])
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+        def log_message(self, *args):
+            pass
+
+    url = serve(KeepAliveHandler)
+    request = ThrottledRequest(100)
+    for _ in range(3):
+        assert request.get_json(url) == {}
+    request.close()
+    assert len(client_ports) == 1
+
+
+def test_token_bucket(monkeypatch):
+    from pyracetimegg import object_mapping
+    from pyracetimegg.object_mapping import TokenBucket
+
+    now = [1000.0]
+    monkeypatch.setattr(object_mapping, "time", lambda: now[0])
+
+    bucket = TokenBucket(2.5, burst=3)
+    wait_times = [bucket.reserve() for _ in range(5)]
+    assert wait_times[:3] == [0, 0, 0]
+    assert wait_times[3:] == [pytest.approx(0.4), pytest.approx(0.8)]
+    now[0] += 2.0  # booked tokens are paid back, then 3 tokens are saved up
+    assert [bucket.reserve() for _ in range(4)] == [0, 0, 0, pytest.approx(0.4)]
+
+    slow_bucket = TokenBucket(0.5)
+    assert slow_bucket.reserve() == 0
+    assert slow_bucket.reserve() == pytest.approx(2.0)
+
+
+def test_fetch_json_single_flight(serve):
+    from threading import Thread
+    from time import sleep
+    from pyracetimegg.object_mapping import APIBase
+
+    requested_paths = []
+
+    def respond(path):
+        requested_paths.append(path)
+        sleep(0.3)
+        return 200, {"count": 1}
+
+    api = APIBase(serve(respond), request_per_second=100)
+    results = []
+    threads = [Thread(target=lambda: results.append(api.fetch_json_from_site("data"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert requested_paths == ["/data"]
+    assert len(results) == 8
+    assert all(result is results[0] for result in results)
+
+
+def test_cache_policy():
+    from pyracetimegg import User
+    from pyracetimegg.object_mapping import APIBase, CachePolicy
+
+    api = APIBase("https://racetime.gg", cache_policy={"User": CachePolicy(max_entries=2)})
+    user_a = api.get_instance(User, {"id": "a", "name": "A"})
+    api.get_instance(User, {"id": "b", "name": "B"})
+    api.get_instance(User, "a")  # a is used recently
+    api.get_instance(User, {"id": "c", "name": "C"})
+
+    stats = api.cache_stats("User")
+    assert stats.entries == 2
+    assert stats.evictions == 1
+    assert api.get_cache("User", "a").get("name") == "A"
+    assert user_a.name == "A"
+    assert api.cache_stats("User").hits == 2
+
+    unlimited = api.cache_stats("Race")
+    assert unlimited.entries == 0
+
+
+def test_cache_ttl():
+    import pytest
+    from time import sleep
+    from pyracetimegg.object_mapping import APIBase, CachePolicy
+
+    api = APIBase("https://racetime.gg", cache_policy=CachePolicy(ttl=60, tag_ttl={"status": 0.1}))
+    cache = api.get_cache("Race", "smw/comic-baby-9383")
+    cache.update({"status": "open", "goal": "Any%"})
+    assert cache.get("status") == "open"
+    sleep(0.15)
+    with pytest.raises(KeyError):
+        cache.get("status")
+    assert cache.get("goal") == "Any%"
+    assert api.cache_stats("Race").misses == 1
+
+
+def test_cache_max_bytes():
+    from pyracetimegg.object_mapping import APIBase, CachePolicy
+
+    api = APIBase("https://racetime.gg", cache_policy=CachePolicy(max_bytes=2000))
+    for i in range(10):
+        api.get_cache("User", str(i)).update({"name": "x" * 500})
+    stats = api.cache_stats("User")
+    assert stats.nbytes <= 2000
+    assert stats.evictions > 0
+
+    # cached data which grows after insert is trimmed too
+    api = APIBase("https://racetime.gg", cache_policy=CachePolicy(max_bytes=2000))
+    caches = [api.get_cache("User", str(i)) for i in range(10)]
+    for cache in caches:
+        cache.update({"name": "x" * 500})
+    assert api.cache_stats("User").nbytes <= 2000
+    caches[-1].update({"flair": "x" * 1000})
+    stats = api.cache_stats("User")
+    assert stats.nbytes <= 2000
+    assert stats.entries == 1
+    assert api.get_cache("User", "9") is caches[-1]  # the grown cache is kept
+
+
+def test_cache_eviction_cost():
+    from collections import OrderedDict
+    from pyracetimegg.object_mapping import APIBase, CachePolicy
+
+    class CountingDict(OrderedDict):
+        visited = 0
+
+        def items(self):
+            for item in super().items():
+                CountingDict.visited += 1
+                yield item
+
+    def fill(max_entries: int):
+        api = APIBase("https://racetime.gg", cache_policy=CachePolicy(max_entries=max_entries))
+        api.get_cache("User", "0").space._CacheSpace__entries = CountingDict()
+        for i in range(20000):
+            api.get_cache("User", str(i))
+        return api.cache_stats("User")
+
+    # inserts into a large limited space don't scan the whole space
+    fill(10**6)
+    assert CountingDict.visited == 0
+
+    stats = fill(100)
+    assert stats.entries == 100
+    assert stats.evictions == 20000 - 100
+    assert CountingDict.visited <= 2 * 20000  # the oldest entry and a second chance at most
+
+
+def test_fetch_json_if_modified(serve):
+    from http.server import BaseHTTPRequestHandler
+    from requests import HTTPError
+    from pyracetimegg.object_mapping import APIBase
+
+    body = {"etag": b'{"version": 1}', "plain": b'{"version": 1}'}
+    status_codes = []
+
+    class ConditionalHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = self.path.strip("/")
+            if path not in body:
+                self.send_response(404)
+                self.end_headers()
+                return
+            etag = '"' + str(hash(body[path])) + '"'
+            if path == "etag" and self.headers.get("If-None-Match") == etag:
+                status_codes.append(304)
+                self.send_response(304)
+                self.end_headers()
+                return
+            status_codes.append(200)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            if path == "etag":
+                self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.write(body[path])
+
+        def log_message(self, *args):
+            pass
+
+    api = APIBase(serve(ConditionalHandler), request_per_second=100)
+    for path in ("etag", "plain"):
+        url = api.get_url(path)
+        json_data, validator = api.fetch_json_if_modified(url)
+        assert json_data == {"version": 1}
+        assert api.fetch_json_if_modified(url, validator) == (None, validator)
+        body[path] = b'{"version": 2}'
+        assert api.fetch_json_if_modified(url, validator)[0] == {"version": 2}
+    assert status_codes == [200, 304, 200, 200, 200, 200]
+
+    with pytest.raises(HTTPError):
+        api.fetch_json_if_modified(api.get_url("missing"))
+
+
+def test_lazy():
+    from threading import Thread
+    from time import sleep
+    from pyracetimegg.object_mapping import _Cache, lazy
+
+    calls = list()
+
+    def decode(api, value):
+        calls.append(value)
+        sleep(0.05)
+        return tuple(value)
+
+    cache = _Cache()
+    cache.update({"entrants": lazy(decode)(None, [1, 2])})
+    assert len(calls) == 0
+
+    results = list()
+    threads = [Thread(target=lambda: results.append(cache["entrants"])) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [(1, 2)] * 4
+    assert cache.get("entrants") == (1, 2)
+    assert len(calls) == 1
+
+
+def test_lazy_size():
+    from sys import getsizeof
+    from pyracetimegg.object_mapping import APIBase, lazy
+
+    api = APIBase("https://racetime.gg")
+    cache = api.get_cache("Race", "smw/comic-baby-9383")
+    raw = [{"name": str(i)} for i in range(100)]
+    cache.update({"entrants": lazy(lambda api, value: len(value))(api, raw)})
+    assert cache.nbytes >= getsizeof(raw) + 100 * getsizeof(raw[0])  # raw json is counted
+    assert api.cache_stats("Race").nbytes == cache.nbytes
+
+    assert cache["entrants"] == 100
+    assert cache.nbytes == getsizeof(100)  # decoded value replaces raw json
+    assert api.cache_stats("Race").nbytes == cache.nbytes
+
+
+def test_field():
+    from pyracetimegg import Category, Race, User
+    from pyracetimegg.object_mapping import APIBase, Field
+
+    assert isinstance(Race.status, Field)
+    assert Category.leaderboard.endpoint == "leaderboard_url"
+    assert User.past_race.endpoint is None
+    assert "opened_at" in Race._field_spec() and "leaderboard" not in Category._field_spec()
+
+    offline_api = APIBase("http://127.0.0.1:9/")  # nothing is listening
+    user = offline_api.get_instance(User, {"id": "user_a", "name": "name_a", "pronouns": "she/her"})
+    assert user.name == "name_a"
+    assert user.pronouns is User.Pronouns.SHE_HER
+    category = offline_api.get_instance(Category, {"slug": "smw"})
+    assert category.leaderboard_url == category._endpoint("leaderboard")
+    assert category._endpoint("name") == category.data_url
+
+
+def test_intern():
+    from pyracetimegg import Goal, Race
+    from pyracetimegg.object_mapping import APIBase
+
+    offline_api = APIBase("http://127.0.0.1:9/")  # nothing is listening
+    goal = offline_api.intern(Goal("Any%", False))
+    assert offline_api.intern(Goal("Any%", False)) is goal
+    assert offline_api.intern(Goal("Any%", True)) is not goal
+    assert not hasattr(goal, "__dict__")
+    assert not hasattr(offline_api.get_instance(Race, "smw/comic-baby-9383"), "__dict__")
+
+    race_data = {"name": "smw/comic-baby-9383", "goal": {"name": "Any%", "custom": False}}
+    assert offline_api.get_instance(Race, race_data).goal is goal
+    custom_data = {"name": "smw/lucky-mario-0001", "goal": {"name": "my goal", "custom": True}}
+    custom = offline_api.get_instance(Race, custom_data).goal
+    assert offline_api.intern(Goal("my goal", True)) is not custom  # custom goals are not interned
+
+    view = offline_api.detached()
+    assert view.intern(Goal("96 Exit", False)) is not offline_api.intern(Goal("96 Exit", False))
+
+
+def test_identity_map():
+    import gc
+    from pyracetimegg import User
+    from pyracetimegg.object_mapping import APIBase, CachePolicy
+
+    offline_api = APIBase("http://127.0.0.1:9/", cache_policy={"User": CachePolicy(retain=False)})
+    user_a = offline_api.get_instance(User, {"id": "a", "name": "A"})
+    assert offline_api.get_instance(User, "a") is user_a
+    assert offline_api.get_instance(User, {"id": "a", "name": "A2"}) is user_a
+    assert user_a.name == "A2"
+    assert len({user_a, offline_api.get_instance(User, "a"), offline_api.get_instance(User, "b")}) == 2
+    assert offline_api.detached().get_instance(User, "a") is not user_a
+
+    assert offline_api.cache_stats("User").entries == 1
+    del user_a
+    gc.collect()
+    assert offline_api.cache_stats("User").entries == 0
+
+
+def test_detached():
+    import gc
+    from pyracetimegg import User
+    from pyracetimegg.object_mapping import APIBase
+
+    offline_api = APIBase("http://127.0.0.1:9/")
+    view = offline_api.detached()
+    assert view._throttled_request is offline_api._throttled_request
+    assert view.executor is offline_api.executor
+
+    user_a = view.get_instance(User, {"id": "a", "name": "A"})
+    assert view.get_instance(User, "a") is user_a
+    assert offline_api.cache_stats("User").entries == 0
+    assert view.cache_stats("User").entries == 1
+    del user_a
+    gc.collect()
+    assert view.cache_stats("User").entries == 0
+
+    view.close()  # the thread pool and connections belong to offline_api
+    assert offline_api.executor.submit(lambda: 1).result() == 1
+    offline_api.close()
+
+
+def test_identity_map_reuses_owner(monkeypatch):
+    from pyracetimegg import Race, User
+    from pyracetimegg.object_mapping import APIBase
+
+    offline_api = APIBase("http://127.0.0.1:9/")  # nothing is listening
+    user_a = offline_api.get_instance(User, {"id": "a", "name": "A"})
+    race = offline_api.get_instance(Race, {"name": "smw/comic-baby-9383", "info": "x"})
+
+    def fail(*args):
+        raise AssertionError("wrapper is constructed for a living object")
+
+    monkeypatch.setattr(User, "_on_cache", classmethod(fail))
+    monkeypatch.setattr(Race, "_on_cache", classmethod(fail))
+    assert offline_api.get_instance(User, "a") is user_a
+    assert offline_api.get_instance(User, {"id": "a", "name": "A2"}) is user_a
+    assert user_a.name == "A2"
+    assert offline_api.get_instance(Race, {"name": "smw/comic-baby-9383", "info": "y"}) is race
+    assert race.info == "y"
+
+
+def test_lazy_decode_keeps_newer_data(serve):
+    from pyracetimegg import Race, User
+    from pyracetimegg.object_mapping import APIBase
+
+    user_json = {"id": "a", "name": "A2", "discriminator": "0002", "flair": "new"}
+    api = APIBase(serve(lambda path: (200, user_json)), request_per_second=100)
+    user = api.get_instance(User, "a")
+    user.load("name")
+
+    entrant = {
+        "user": {"id": "a", "name": "A1", "discriminator": "0001", "flair": "old"},
+        "status": {"value": "done"},
+        "finish_time": "P0DT01H00M00S",
+        "finished_at": "2023-01-01T01:00:00.000Z",
+        "place": 1,
+        "score": None,
+        "score_change": None,
+        "comment": None,
+        "has_comment": False,
+        "stream_live": False,
+        "stream_override": False,
+    }
+    old_race = api.get_instance(Race, {"name": "smw/comic-baby-9383", "entrants": [entrant]})
+    assert old_race.entrants[0].user is user
+    assert (user.name, user.discriminator, user.flair) == ("A2", "0002", "new")
+
+
+def test_fill_lock_per_endpoint(serve):
+    from threading import Thread
+    from time import sleep, time
+    from pyracetimegg import Category
+    from pyracetimegg.object_mapping import APIBase
+
+    def respond(path):
+        if path.startswith("/smw/leaderboards"):
+            sleep(0.5)
+            return 200, {"leaderboards": []}
+        return 200, {"slug": "smw", "name": "Super Mario World"}
+
+    api = APIBase(serve(respond), request_per_second=100, max_concurrency=4)
+    category = api.get_instance(Category, "smw")
+    thread = Thread(target=lambda: category.leaderboard)
+    thread.start()
+    sleep(0.1)
     start_time = time()
-    for _ in range(frame_rate * 5):
-        rate.sleep()
-    result = time() - start_time
-    assert 4.9 < result < 5.1
+    assert category.name == "Super Mario World"
+    assert time() - start_time < 0.3  # doesn't wait for leaderboard
+    thread.join()
+    assert category.leaderboard == dict()
+
+
+def test_load_groups_tags_by_endpoint(serve):
+    from pyracetimegg import Race
+    from pyracetimegg.object_mapping import APIBase
+
+    requested_paths = []
+
+    def respond(path):
+        requested_paths.append(path)
+        race = {"name": "smw/comic-baby-9383", "status": {"value": "open"}, "goal": {"name": "Any%", "custom": False}}
+        return 200, {**race, "entrants": []}
+
+    api = APIBase(serve(respond), request_per_second=100)
+    race = api.get_instance(Race, "smw/comic-baby-9383")
+    race.load(["status", "entrants", "goal"])
+    assert requested_paths == ["/smw/comic-baby-9383/data"]
+    assert race.status is Race.Status.OPEN
+    assert race.entrants == tuple()
+
+
+def test_absent_field(serve):
+    import pytest
+    from pyracetimegg import User
+    from pyracetimegg.object_mapping import APIBase
+
+    requested_paths = []
+
+    def respond(path):
+        requested_paths.append(path)
+        return 200, {"id": "a", "name": "A"}
+
+    api = APIBase(serve(respond), request_per_second=100)
+    user = api.get_instance(User, {"id": "a", "name": "A"})  # e.g. user in a race
+    assert user.twitch_name is None
+    assert user.twitch_name is None
+    with pytest.raises(KeyError):
+        user.discriminator
+    with pytest.raises(KeyError):
+        user.discriminator
+    assert requested_paths == ["/user/a/data"]
+
+
+def test_revalidate_after_clear(serve):
+    from pyracetimegg import User
+    from pyracetimegg.object_mapping import APIBase
+
+    user_json = {"id": "a", "name": "A", "discriminator": "0001", "twitch_name": "a_tv"}
+    api = APIBase(serve(lambda path: (200, user_json)), request_per_second=100)
+    user = api.get_instance(User, "a")
+    user.load("name")
+    user.clear()
+    assert api.get_instance(User, {"id": "a", "name": "A"}) is user  # e.g. user in a race
+    user.load("name")  # validators of the cleared data are not used for the data from the listing
+    assert user.twitch_name == "a_tv"
+    assert user.discriminator == "0001"
+
+
+def test_revalidate_evicted_cache(serve):
+    from pyracetimegg import User
+    from pyracetimegg.object_mapping import APIBase, CachePolicy
+
+    names = {"a": "A1", "b": "B1"}
+
+    def respond(path):
+        id = path.split("/")[2]
+        return 200, {"id": id, "name": names[id], "discriminator": "0001"}
+
+    api = APIBase(serve(respond), request_per_second=100, cache_policy=CachePolicy(max_entries=1))
+    old = api.get_instance(User, "a")
+    old.load("name")
+    api.get_instance(User, "b").load("name")  # evicts the cache of old
+    names["a"] = "A2"
+    fresh = api.get_instance(User, "a")
+    assert fresh is not old
+    fresh.load("name")
+    assert fresh.name == "A2"
+    old.load("name")
+    assert old.name == "A2"
@@ -109,7 +109,7 @@ def test_race():
     assert race.entrants[0].team is None
     assert race.entrants[0].status is Race.Entrant.Status.DONE
     assert race.entrants[0].finish_time == timedelta(minutes=17, seconds=13, milliseconds=267)
-    assert race.entrants[0].finished_at == datetime(2022, 3, 20, 12, 27, 45, 964, tzinfo=ZoneInfo("UTC"))
+    assert race.entrants[0].finished_at == datetime(2022, 3, 20, 12, 27, 45, 964000, tzinfo=ZoneInfo("UTC"))
     assert race.entrants[0].place == 1
     assert race.entrants[0].place_ordinal == "1st"
     assert race.entrants[0].score is None
@@ -119,10 +119,10 @@ def test_race():
     assert race.entrants[0].stream_live is False
     assert race.entrants[0].stream_override is False
 
-    assert race.opened_at == datetime(2022, 3, 20, 11, 50, 38, 7, tzinfo=ZoneInfo("UTC"))
+    assert race.opened_at == datetime(2022, 3, 20, 11, 50, 38, 7000, tzinfo=ZoneInfo("UTC"))
     assert race.start_delay == timedelta(seconds=20)
-    assert race.started_at == datetime(2022, 3, 20, 12, 10, 32, 696, tzinfo=ZoneInfo("UTC"))
-    assert race.ended_at == datetime(2022, 3, 20, 12, 28, 40, 275, tzinfo=ZoneInfo("UTC"))
+    assert race.started_at == datetime(2022, 3, 20, 12, 10, 32, 696000, tzinfo=ZoneInfo("UTC"))
+    assert race.ended_at == datetime(2022, 3, 20, 12, 28, 40, 275000, tzinfo=ZoneInfo("UTC"))
     assert race.cancelled_at is None
     assert race.unlisted is False
     assert race.time_limit == timedelta(days=1)
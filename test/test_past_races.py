@@ -0,0 +1,213 @@
+# Copyright (c) 2023 Nanahuse
+# This software is released under the MIT License
+# https://github.com/Nanahuse/PyRacetimeGG/blob/main/LICENSE
+
+from datetime import timedelta
+from pyracetimegg import Category
+from pyracetimegg.object_mapping import APIBase
+
+
+def _names(*ks: int):
+    return [f"smw/fake-race-{k:04d}" for k in ks]
+
+
+def _past_race(fake_site, num_races: int, **options):
+    """
+    Returns:
+        tuple[APIBase, PastRaces, FakeSite]: nothing is requested yet.
+    """
+    url, site = fake_site(num_races)
+    local_api = APIBase(url, 100, **options)
+    return local_api, local_api.get_instance(Category, "smw").past_race, site
+
+
+def test_iterate_read_ahead(fake_site):
+    _, past_race, site = _past_race(fake_site, 95, max_concurrency=4)
+    site.latency = 0.1
+    names = [race.name for race in past_race.iterate(read_ahead=3)]
+    assert names == _names(*range(94, -1, -1))
+    assert sorted(site.page_requests()) == list(range(1, 11))
+    assert site.max_in_flight > 1  # pages ahead are fetched while reading
+
+    site.clear_requests()
+    assert [race.name for race in past_race] == names
+    assert site.page_requests() == []
+
+
+def test_load_pages_concurrently(fake_site):
+    _, past_race, site = _past_race(fake_site, 95, max_concurrency=4)
+    site.latency = 0.1
+    past_race.load()
+    assert sorted(site.page_requests()) == list(range(1, 11))
+    assert site.max_in_flight > 1
+    assert [race.name for race in past_race[8:12]] == _names(86, 85, 84, 83)
+
+
+def test_load_keeps_unchanged_pages(fake_site):
+    local_api, past_race, site = _past_race(fake_site, 35)
+    past_race.load()
+    kept, changed = past_race[15], past_race[25]
+    local_api.get_cache("Race", kept.name).update({"info": "local"})
+    with site.lock:
+        site.races[25] = {**site.races[25], "info": "edited"}
+
+    site.clear_requests()
+    past_race.load()
+    assert sorted(site.page_requests()) == [1, 2, 3, 4]  # revalidated
+    assert kept.info == "local"  # page 2 has not changed. it is not decoded again.
+    assert past_race[25] == changed
+    assert changed.info == "edited"
+
+
+def test_load_revalidates_own_pages(fake_site):
+    from pyracetimegg.objects.race import PastRaces
+
+    local_api, past_race, site = _past_race(fake_site, 35)
+    past_race.load()
+    with site.lock:
+        site.races[25] = site.race(99)
+    PastRaces(local_api.get_instance(Category, "smw")).load()  # validators of it are not shared
+
+    past_race.load()
+    assert past_race[25].name == "smw/fake-race-0099"
+
+
+def test_refresh_shifts_loaded_races(fake_site):
+    _, past_race, site = _past_race(fake_site, 35)
+    assert past_race.refresh() is None  # nothing has loaded
+    oldest = past_race[34]
+    first = past_race[0]
+
+    site.add_races(3)
+    site.clear_requests()
+    assert past_race.refresh() == 3
+    assert site.page_requests() == [1]
+    assert [race.name for race in past_race[:4]] == _names(37, 36, 35, 34)
+    assert past_race[3] == first
+    assert len(past_race) == 38
+    assert past_race[37] == oldest  # shifted without fetching
+
+    site.add_races(12)
+    site.clear_requests()
+    assert past_race.refresh() == 12
+    assert sorted(site.page_requests()) == [1, 2]  # new races fill page 1 and a part of page 2
+    assert [race.name for race in past_race[10:16]] == _names(39, 38, 37, 36, 35, 34)
+    assert past_race[15] == first
+    assert past_race[49] == oldest
+    assert site.page_requests() == [1, 2]
+
+
+def test_refresh_without_change(fake_site):
+    _, past_race, site = _past_race(fake_site, 35)
+    race = past_race[0]
+    site.clear_requests()
+    assert past_race.refresh() == 0
+    assert site.page_requests() == [1]
+    assert past_race[0] == race
+
+
+def test_refresh_after_shrink(fake_site):
+    _, past_race, site = _past_race(fake_site, 35)
+    past_race.load()
+    site.remove_races(2)
+    site.clear_requests()
+    assert past_race.refresh() is None  # loaded races can't be shifted
+    assert site.page_requests() == [1]
+    assert len(past_race) == 33
+    assert past_race[2].name == "smw/fake-race-0030"
+    assert site.page_requests() == [1]
+
+
+def test_find(fake_site):
+    import pytest
+
+    _, past_race, site = _past_race(fake_site, 95)
+    assert past_race.find("smw/fake-race-0050", load=False) is None
+    assert site.page_requests() == [1]  # only the length is known
+    assert past_race.find("smw/fake-race-0090") == 4  # loaded page
+    assert site.page_requests() == [1]
+
+    past_race[45]
+    site.clear_requests()
+    assert past_race.find(past_race[45]) == 45
+    assert past_race.index("smw/fake-race-0049") == 45
+    assert past_race.count("smw/fake-race-0049") == 1
+    assert "smw/fake-race-0049" in past_race
+    assert site.page_requests() == []  # a hit on a loaded page doesn't download the rest
+
+    assert 49 not in past_race
+    assert past_race.count(49) == 0
+    with pytest.raises(ValueError):
+        past_race.index(49)
+    assert site.page_requests() == []
+
+    assert past_race.find("smw/unknown-race-0000") is None
+    assert sorted(site.page_requests()) == [2, 3, 4, 6, 7, 8, 9, 10]
+
+
+def test_between(fake_site):
+    _, past_race, site = _past_race(fake_site, 95)
+    start = site.T0 + timedelta(days=40)
+    races = past_race.between(start, start + timedelta(days=10))
+    assert [race.name for race in races] == _names(*range(49, 39, -1))  # [start, end)
+    requests = site.page_requests()
+    assert len(requests) <= 5  # page 1 and binary search over 10 pages
+    assert len(set(requests)) == len(requests)
+
+    assert past_race.between(start, start) == tuple()
+    assert [race.name for race in past_race.since(site.T0 + timedelta(days=92))] == _names(94, 93, 92)
+    assert [race.name for race in past_race.between(None, site.T0 + timedelta(days=2))] == _names(1, 0)
+    assert len(set(site.page_requests())) == len(site.page_requests())  # no page is fetched twice
+
+
+def test_max_pages(fake_site):
+    _, past_race, site = _past_race(fake_site, 95)
+    past_race.max_pages = 2
+    names = [race.name for race in past_race]
+    assert names == _names(*range(94, -1, -1))
+    assert sorted(site.page_requests()) == list(range(1, 11))
+
+    site.clear_requests()
+    assert past_race.find("smw/fake-race-0094", load=False) == 0  # the first page is kept
+    assert past_race.find("smw/fake-race-0004", load=False) == 90
+    assert past_race.find("smw/fake-race-0050", load=False) is None  # evicted
+    assert past_race[44].name == "smw/fake-race-0050"  # fetched again
+    assert site.page_requests() == [5]
+
+    site.clear_requests()
+    past_race.max_pages = 1
+    start = site.T0 + timedelta(days=5)
+    races = past_race.between(start, start + timedelta(days=80))
+    assert [race.name for race in races] == _names(*range(84, 4, -1))
+    assert len(site.page_requests()) <= 8 + 6  # 8 pages in the range and binary search of 2 boundaries
+
+
+def test_index_error_after_shrink(fake_site):
+    import pytest
+
+    _, past_race, site = _past_race(fake_site, 35)
+    assert len(past_race) == 35
+    site.remove_races(10)
+    with pytest.raises(IndexError):
+        past_race[30]
+    assert [race.name for race in past_race][-1] == "smw/fake-race-0000"
+
+
+def test_stream_keeps_nothing(fake_site):
+    from pyracetimegg.cache_backend import SQLiteCacheBackend
+
+    url, site = fake_site(35)
+    backend = SQLiteCacheBackend()
+    local_api = APIBase(url, 100, cache_backend=backend)
+    past_race = local_api.get_instance(Category, "smw").past_race
+
+    pages = list(past_race.stream(decode="objects"))
+    assert [race.name for races in pages for race in races] == _names(*range(34, -1, -1))
+    assert pages[0][0].opened_by.name == "User4"
+    raw_pages = list(past_race.stream([2], decode="raw"))
+    assert [race["name"] for race in raw_pages[0]] == _names(*range(24, 14, -1))
+
+    assert local_api.cache_stats("Race").entries == 0
+    assert local_api.cache_stats("User").entries == 0
+    page_url = local_api.get_url("smw", "races/data?show_entrants=yes&page=1")
+    assert backend.load("PastRaces", "smw", page_url) is None
@@ -2,6 +2,8 @@
 # This software is released under the MIT License
 # https://github.com/Nanahuse/PyRacetimeGG/blob/main/LICENSE
 
+import pytest
+
 
 def test_place2str():
     from pyracetimegg.utils import place2str
@@ -32,7 +34,8 @@ def test_str2datetime():
     from zoneinfo import ZoneInfo
     from pyracetimegg.utils import str2datetime
 
-    assert str2datetime("2022-03-20T11:50:38.007Z") == datetime(2022, 3, 20, 11, 50, 38, 7, tzinfo=ZoneInfo("UTC"))
+    assert str2datetime("2022-03-20T11:50:38.007Z") == datetime(2022, 3, 20, 11, 50, 38, 7000, tzinfo=ZoneInfo("UTC"))
+    assert str2datetime("2022-03-20T11:50:38.5Z") == datetime(2022, 3, 20, 11, 50, 38, 500000, tzinfo=ZoneInfo("UTC"))
 
 
 def test_str2timedelta():
@@ -41,9 +44,38 @@ def test_str2timedelta():
 
     assert str2timedelta("P0DT00H18M07.497596S") == timedelta(minutes=18, seconds=7, milliseconds=497)
     assert str2timedelta("P1DT00H00M00S") == timedelta(days=1)
+    assert str2timedelta("P0DT00H00M07.5S") == timedelta(seconds=7, milliseconds=500)
 
 
 def test_joint_url():
     from pyracetimegg.utils import joint_url
 
     assert joint_url("a", "/b", "/c/", "d", "e/") == "a/b/c/d/e"
+
+
+def test_batch_parsers():
+    np = pytest.importorskip("numpy")
+    from pyracetimegg.utils import strs2datetime64, strs2ms, strs2timedelta64
+
+    datetimes = strs2datetime64(["2022-03-20T11:50:38.007596Z", "2022-03-20T11:50:38Z", None])
+    assert datetimes[0] == np.datetime64("2022-03-20T11:50:38.007")
+    assert datetimes[1] == np.datetime64("2022-03-20T11:50:38.000")
+    assert np.isnat(datetimes[2])
+
+    assert strs2ms(["P0DT00H18M07.497596S", "P1DT00H00M00S", None]).tolist() == [1087497, 86400000, -1]
+    timedeltas = strs2timedelta64(["P0DT00H18M07.497596S", None])
+    assert timedeltas[0] == np.timedelta64(1087497, "ms")
+    assert np.isnat(timedeltas[1])
+
+
+def test_batch_parsers_match_scalar():
+    np = pytest.importorskip("numpy")
+    from pyracetimegg.utils import str2datetime, str2timedelta, strs2datetime64, strs2ms
+
+    datetimes = ["2022-03-20T11:50:38.007596Z", "2022-03-20T11:50:38.5Z", "2022-03-20T11:50:38Z"]
+    for string, batch in zip(datetimes, strs2datetime64(datetimes)):
+        assert np.datetime64(str2datetime(string).replace(tzinfo=None), "ms") == batch
+
+    durations = ["P0DT00H18M07.497596S", "P0DT00H00M07.5S", "P0DT00H00M07.05S", "P2DT03H00M00S"]
+    for string, milliseconds in zip(durations, strs2ms(durations).tolist()):
+        assert str2timedelta(string) // np.timedelta64(1, "ms").item() == milliseconds